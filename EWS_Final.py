@@ -381,7 +381,6 @@ def generate_ncr_report_for_ews(df: pd.DataFrame, report_type: str, start_date=N
             processed_data = filtered_df.to_dict(orient="records")
             
             cleaned_data = []
-            unique_records = []
 
             # Define standard_sites before using assign_site
             standard_sites = [
@@ -427,8 +426,6 @@ def generate_ncr_report_for_ews(df: pd.DataFrame, report_type: str, start_date=N
                     else:
                         cleaned_record["Discipline_Category"] = "MEP"
 
-                        
-                    unique_records.append(cleaned_record["Description"])
 
                     # Tower assignment using assign_site
                     matched_towers = assign_site(cleaned_record["Description"], standard_sites)
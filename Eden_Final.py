@@ -4,22 +4,33 @@ import io
 import streamlit as st
 import requests
 import json
+import csv
 import urllib.parse
 import urllib3
 import certifi
 import pandas as pd  
+import numpy as np
+import xlsxwriter
 from bs4 import BeautifulSoup
 from datetime import datetime
 import re
 import logging
 import os
+import time
 from dotenv import load_dotenv
 from io import BytesIO
 import base64
+import hashlib
+import threading
+from html import unescape
+from collections import Counter, defaultdict
+from itertools import zip_longest
+from functools import lru_cache
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from typing import Tuple, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,6 +39,10 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# The root logger above is configured at DEBUG; this module logs at INFO unless LOG_LEVEL asks for more,
+# so the DEBUG-only JSON dumps guarded by logger.isEnabledFor are skipped in normal runs
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
 # WatsonX configuration
 WATSONX_API_URL = os.getenv("WATSONX_API_URL")
 MODEL_ID = os.getenv("MODEL_ID")
@@ -49,8 +64,293 @@ LOGIN_URL = "https://dms.asite.com/apilogin/"
 SEARCH_URL = "https://adoddleak.asite.com/commonapi/formsearchapi/search"
 IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
 
+# Description fields are simple rich-text HTML; stripping tags with a regex avoids a parser per row
+TAG_RE = re.compile(r"<[^>]+>")
+HTML_SPACES = " \t\n\r\f"
+
+# Shared decoder for pulling a JSON object out of free-form model output
+JSON_DECODER = json.JSONDecoder()
+
+# NCR description patterns (pour numbers and tower references)
+COMMON_AREA_RE = re.compile(r"common area|flat\s*no", re.IGNORECASE)
+# Ranges ("p1 to 8", "pour 1-8") and lists ("p 1, 2 & 3") are matched in a single scan
+POURS_RE = re.compile(r"(?:pour|p)[-\s]*(\d+)[-\s]*(?:to|-)[-\s]*(\d+)|(?:pour|p)[-\s]*([0-9,\s&and]+)", re.IGNORECASE)
+LIST_RE = re.compile(r"(?:pour|p)[-\s]*([0-9,\s&and]+)", re.IGNORECASE)
+INDIV_RE = re.compile(r"(?:pour|p)[-\s]*(\d+)(?!\s*(?:to|-)\s*\d+)", re.IGNORECASE)
+DIGITS_RE = re.compile(r"\d+")
+TOWER_RE = re.compile(r"(?:tower|t)\s*-?\s*(\d+)", re.IGNORECASE)
+MULTI_TOWER_RE = re.compile(r"(?:tower|t)\s*-?\s*(\d+)\s*(?:[,&]|and)\s*(?:tower|t)?\s*-?\s*(\d+)", re.IGNORECASE)
+CLUBHOUSE_RE = re.compile(r"eden clubhouse|eden-clubhouse|eden club")
+# Safety descriptions may name a tower-specific (or two-tower) common area, e.g. Eden-Tower-04-05-CommonArea
+TOWER_COMMON_AREA_RE = re.compile(r'(?:eden-)?tower-(\d+)(?:-(\d+))?-commonarea', re.IGNORECASE)
+SAFETY_TOWER_RE = re.compile(r"(?:eden-)?(?:tower|t)\s*-?\s*(\d+|2021|28)", re.IGNORECASE)
+# Tower number in a report site key ("Eden-Tower-05", "T 6"), used when laying out the Excel sheets
+SITE_TOWER_RE = re.compile(r"(?:eden-)?(?:tower|t)[- ]?(\d+)", re.IGNORECASE)
+# NCR discipline code -> Excel summary column; callers choose the column for any other code
+DISCIPLINE_TO_CATEGORY = {'SW': 'Structure Works', 'FW': 'Civil Finishing', 'MEP': 'MEP', 'HSE': 'MEP'}
+
+# Housekeeping keywords, matched against the lowercased description as a single regex union
+HOUSEKEEPING_KEYWORDS = [
+    'housekeeping', 'cleaning', 'cleanliness', 'waste disposal', 'waste management', 'garbage', 'trash',
+    'rubbish', 'debris', 'litter', 'dust', 'untidy', 'cluttered', 'accumulation of waste', 'construction waste',
+    'pile of garbage', 'poor housekeeping', 'material storage', 'construction debris', 'cleaning schedule',
+    'garbage collection', 'waste bins', 'dirty', 'mess', 'unclean', 'disorderly', 'dirty floor',
+    'waste disposal area', 'waste collection', 'cleaning protocol', 'sanitation', 'trash removal',
+    'waste accumulation', 'unkept area', 'refuse collection', 'workplace cleanliness'
+]
+HOUSEKEEPING_SAFETY_KEYWORDS = ['safety precautions', 'PPE', 'fall protection', 'safety belts', 'barricades']
+HOUSEKEEPING_RE = re.compile("|".join(map(re.escape, HOUSEKEEPING_KEYWORDS)))
+HOUSEKEEPING_SAFETY_RE = re.compile("|".join(map(re.escape, HOUSEKEEPING_SAFETY_KEYWORDS)))
+
+# Safety keywords, matched against the lowercased description as a single regex union
+SAFETY_KEYWORDS = [
+    # --- Personal Protective Equipment (PPE) ---
+    'ppe', 'helmet', 'safety shoes', 'safety belt', 'harness', 'without ppe',
+    'no helmet', 'no shoes', 'no safety belt',
+    # --- Working at Height ---
+    'fall protection', 'lifeline', 'guard rail', 'unprotected edge',
+    'working at height', 'fall catch net', 'catch net', 'scaffold', 'ladder',
+    # --- Barricading & Access ---
+    'barricade', 'barricading', 'no barrier', 'unauthorized operation', 'gate',
+    # --- Electrical ---
+    'electrical hazard', 'exposed wire', 'electric shock', 'temporary electricity',
+    'halogen lamp',
+    # --- Excavation & Soil ---
+    'excavation', 'collapse of soil', 'down slope movement',
+    # --- Equipment & Lifting ---
+    'crane', 'lifting', 'rigging', 'tpi', 'third party inspection', 'tpic',
+    'crane operator', 'cabin glass',
+    # --- Fire & Hazardous Materials ---
+    'fire extinguisher', 'fire hazard', 'firecase', 'spill', 'leak',
+    'hazardous material', 'environmental contamination', 'debris chute', 'dust suppression',
+    # --- General Safety Violations ---
+    'unsafe act', 'unsafe condition', 'violation of hse', 'hse norms',
+    'safety norms', 'safety precaution', 'unsafe platform', 'negligence in supervision',
+    'health and safety plan',
+    # --- Keywords from user examples ---
+    'labour is working at height', 'tank','NAT'
+]
+SAFETY_KEYWORDS_RE = re.compile("|".join(map(re.escape, SAFETY_KEYWORDS)))
+
+# WatsonX prompt for NCR chunks; the text either side of {data} only depends on the report type and
+# record count, so it is formatted once per chunk size and each chunk's JSON goes in between
+NCR_PROMPT_TEMPLATE = (
+    "IMPORTANT: RETURN ONLY A SINGLE VALID JSON OBJECT WITH THE EXACT FIELDS SPECIFIED BELOW. "
+    "DO NOT GENERATE ANY CODE (e.g., Python, JavaScript). "
+    "DO NOT INCLUDE ANY TEXT, EXPLANATIONS, OR MULTIPLE RESPONSES OUTSIDE THE JSON OBJECT. "
+    "DO NOT WRAP THE JSON IN CODE BLOCKS (e.g., ```json). "
+    "RETURN THE JSON OBJECT DIRECTLY.\n\n"
+    "Task: Group the provided data by 'Tower' and collect 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status', 'Discipline', and 'Pours' into arrays. "
+    "Count the records by 'Discipline_Category' ('SW', 'FW', 'MEP'), calculate the 'Total' for each 'Tower', and count occurrences of each pour within 'Pours' (e.g., P1, P2). "
+    "Process ALL {record_count} records provided in the data.\n"
+    "Use 'Tower' values (e.g., 'Eden-Tower-04-CommonArea', 'Eden-Tower-07-CommonArea', 'Common_Area'), "
+    "'Discipline_Category' values (e.g., 'SW', 'FW', 'MEP'), and provided 'Pours' values. Count each record exactly once.\n\n"
+    "REQUIRED OUTPUT FORMAT (ONLY THESE FIELDS):\n"
+    "{{\n"
+    '  "{report_type}": {{\n'
+    '    "Sites": {{\n'
+    '      "Site_Name1": {{\n'
+    '        "Descriptions": ["description1", "description2"],\n'
+    '        "Created Date (WET)": ["date1", "date2"],\n'
+    '        "Expected Close Date (WET)": ["date1", "date2"],\n'
+    '        "Status": ["status1", "status2"],\n'
+    '        "Discipline": ["discipline1", "discipline2"],\n'
+    '        "Pours": [["pour1a", "pour1b"], ["pour2"]],\n'
+    '        "SW": number,\n'
+    '        "FW": number,\n'
+    '        "MEP": number,\n'
+    '        "Total": number,\n'
+    '        "PoursCount": {{"pour1": count1, "pour2": count2}}\n'
+    '      }}\n'
+    '    }},\n'
+    '    "Grand_Total": {record_count}\n'
+    '  }}\n'
+    '}}\n\n'
+    "Data: {data}\n"
+    "IMPORTANT: Ensure the JSON is valid and contains all required fields. "
+    "Return the result strictly as a JSON object—no code, no explanations, only the JSON.Dont put <|eom_id|> or any other markers in the JSON output. Grand_Total must be {record_count}."
+)
+NCR_PROMPT_HEAD, NCR_PROMPT_TAIL = NCR_PROMPT_TEMPLATE.split("{data}")
+
+# WatsonX prompt for Safety chunks; everything but the chunk data is fixed, so one prefix per report
+# type is formatted at import and each chunk's JSON is appended
+SAFETY_PROMPT_TEMPLATE = (
+    "Generate EXACTLY ONE JSON object matching the format below. Do not repeat input data, generate multiple objects, include code, explanations, or code blocks. "
+    "Count Safety NCRs by 'Tower' where 'Discipline' is 'HSE' and {days_field} > 7. "
+    "Descriptions must contain these keywords (case-insensitive): "
+    "'safety precautions', 'temporary electricity', 'on-site labor is working without wearing safety belt', 'safety norms', 'Missing Cabin Glass – Tower Crane', 'Crane Operator cabin front glass', "
+    "'site on priority basis lifeline is not fixed at the working place', 'operated only after Third Party Inspection and certification crane operated without TPIC', "
+    "'safety precautions are not taken seriously at site Tower crane operator cabin front glass is missing while crane operator is working inside cabin', "
+    "'no barrier around', 'Lock and Key arrangement to restrict unauthorized operations, buzzer while operation, gates at landing platforms, catch net in the vicinity', "
+    "'safety precautions are not taken seriously', 'firecase', 'Health and Safety Plan', 'noticed that submission of statistics report is regularly delayed', "
+    "'crane operator cabin front glass is missing while crane operator is working inside cabin','Tower 7, We have found that the labour is working at height without wearing safety belt and safety shoes leading to violation of HSE norms due to negligence in supervision.', 'labor is working without wearing safety belt', 'barricading', 'tank', 'safety shoes', "
+    "'safety belt', 'helmet', 'lifeline', 'guard rails', 'fall protection', 'PPE','Violations of HSE','electrical hazard', 'unsafe platform', 'catch net', 'edge protection', 'TPI', 'scaffold', "
+    "'lifting equipment', 'dust suppression', 'debris chute', 'spill control', 'crane operator', 'halogen lamps', 'fall catch net', 'environmental contamination', 'fire hazard','continuous collapse of soil leading to instability','continuous down slope movement of soil'.\n\n"
+    "Group by 'Tower' (e.g., 'Eden-Tower 06', 'Common_Area'). Include all input sites, even with count 0. Collect 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status' in arrays. Set 'Count' to the number of matching NCRs.\n\n"
+    "Output Format:\n"
+    "{{\n"
+    '  "Safety": {{\n'
+    '    "Sites": {{\n'
+    '      "Site_Name": {{\n'
+    '        "Descriptions": [],\n'
+    '        "Created Date (WET)": [],\n'
+    '        "Expected Close Date (WET)": [],\n'
+    '        "Status": [],\n'
+    '        "Count": 0\n'
+    '      }}\n'
+    '    }},\n'
+    '    "Grand_Total": 0\n'
+    '  }}\n'
+    '}}\n\n'
+    "Input Data: "
+)
+SAFETY_PROMPT_PREFIXES = {
+    "Closed": SAFETY_PROMPT_TEMPLATE.format(days_field="Days"),
+    "Open": SAFETY_PROMPT_TEMPLATE.format(days_field="Days_From_Reference"),
+}
+
+# Generation stops at the chat end-of-message marker or when the model starts echoing the input block,
+# so responses carry no trailing tokens past the JSON object
+WATSONX_STOP_SEQUENCES = ["<|eom_id|>", "\nData:", "\nInput Data:"]
+
+# IAM tokens live about an hour; reuse them until shortly before they expire
+_token_cache = {}
+_token_lock = threading.Lock()
+TOKEN_EXPIRY_MARGIN = 300
+
+# Concurrent WatsonX chunk requests per report
+WATSONX_WORKERS = int(os.getenv("WATSONX_WORKERS", 8))
+
+# Keep-alive sessions for WatsonX calls, so chunks and reruns do not each pay a new TLS handshake
+def _build_watsonx_session(retry_strategy=None):
+    if retry_strategy is None:
+        retry_strategy = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["POST"]
+        )
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=8, pool_maxsize=WATSONX_WORKERS)
+    http = requests.Session()
+    http.mount("https://", adapter)
+    return http
+
+_watsonx_http = _build_watsonx_session()
+# The Safety report backs off longer, also retries 408s and raises once retries are exhausted
+_watsonx_safety_http = _build_watsonx_session(Retry(
+    total=3,
+    backoff_factor=2,
+    status_forcelist=[500, 502, 503, 504, 429, 408],
+    allowed_methods=["POST"],
+    raise_on_redirect=True,
+    raise_on_status=True
+))
+
+# WatsonX generated_text keyed by a hash of the whole payload (prompt, model and decoding
+# parameters). Decoding is greedy, so a chunk seen before gets the same answer. Callers only
+# cache text that parsed into a usable report, so a bad answer is asked for again next run.
+_watsonx_text_cache = {}
+_watsonx_cache_lock = threading.Lock()
+WATSONX_CACHE_SIZE = int(os.getenv("WATSONX_CACHE_SIZE", 512))
+# Optional directory that also keeps the cached text on disk, so it survives an app restart.
+# Entries expire after WATSONX_CACHE_TTL seconds and the directory keeps at most WATSONX_CACHE_SIZE of them.
+WATSONX_CACHE_DIR = os.getenv("WATSONX_CACHE_DIR")
+WATSONX_CACHE_TTL = int(os.getenv("WATSONX_CACHE_TTL", 7 * 24 * 3600))
+
+def _load_watsonx_text(key):
+    path = os.path.join(WATSONX_CACHE_DIR, f"{key}.txt")
+    try:
+        if time.time() - os.path.getmtime(path) > WATSONX_CACHE_TTL:
+            os.remove(path)
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _prune_watsonx_cache_dir():
+    # Drop the oldest entries once the directory holds more than WATSONX_CACHE_SIZE of them
+    with os.scandir(WATSONX_CACHE_DIR) as it:
+        entries = [entry for entry in it if entry.name.endswith(".txt")]
+    if len(entries) <= WATSONX_CACHE_SIZE:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - WATSONX_CACHE_SIZE]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+def _store_watsonx_text(key, generated_text):
+    path = os.path.join(WATSONX_CACHE_DIR, f"{key}.txt")
+    try:
+        os.makedirs(WATSONX_CACHE_DIR, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a half-written entry
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(generated_text)
+        os.replace(tmp_path, path)
+        _prune_watsonx_cache_dir()
+    except OSError as e:
+        logger.warning(f"Could not write WatsonX cache entry {key[:12]}: {str(e)}")
+
+def _keep_watsonx_text(key, generated_text):
+    with _watsonx_cache_lock:
+        if len(_watsonx_text_cache) >= WATSONX_CACHE_SIZE:
+            _watsonx_text_cache.pop(next(iter(_watsonx_text_cache)))
+        _watsonx_text_cache[key] = generated_text
+
+def _remember_watsonx_text(key, generated_text):
+    """Cache a chunk's generated_text once it has parsed into a usable report."""
+    _keep_watsonx_text(key, generated_text)
+    if WATSONX_CACHE_DIR:
+        _store_watsonx_text(key, generated_text)
+
+def _watsonx_cache_key(payload):
+    # The prompt already embeds the serialized chunk, so hash its text directly rather than
+    # JSON-escaping it a second time; only the small remainder goes through json.dumps
+    digest = hashlib.sha256(payload["input"].encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps({k: v for k, v in payload.items() if k != "input"}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+def _post_watsonx_cached(session, payload, **kwargs):
+    """Return (cache key, generated_text, response) for a WatsonX payload.
+
+    response is None on a cache hit, and generated_text is None when the call did not return 200.
+    A 200 body that is not JSON raises ValueError. Nothing is cached here: pass the key to
+    _remember_watsonx_text once the text has parsed.
+    """
+    key = _watsonx_cache_key(payload)
+    generated_text = _watsonx_text_cache.get(key)
+    if generated_text is not None:
+        logger.info("WatsonX cache hit for %s", key[:12])
+        return key, generated_text, None
+    if WATSONX_CACHE_DIR:
+        generated_text = _load_watsonx_text(key)
+        if generated_text is not None:
+            logger.info("WatsonX disk cache hit for %s", key[:12])
+            _keep_watsonx_text(key, generated_text)
+            return key, generated_text, None
+    response = session.post(WATSONX_API_URL, json=payload, **kwargs)
+    if response.status_code != 200:
+        return key, None, response
+    api_result = json.loads(response.content)
+    return key, api_result.get("results", [{}])[0].get("generated_text", "").strip(), response
+
 # Function to generate access token
 def get_access_token(API_KEY):
+    cached = _token_cache.get(API_KEY)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    # Concurrent reports wait on a single IAM round trip instead of each requesting their own token
+    with _token_lock:
+        cached = _token_cache.get(API_KEY)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        return _request_access_token(API_KEY)
+
+def _request_access_token(API_KEY):
     headers = {"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"}
     data = {"grant_type": "urn:ibm:params:oauth:grant-type:apikey", "apikey": API_KEY}
     try:
@@ -58,6 +358,8 @@ def get_access_token(API_KEY):
         if response.status_code == 200:
             token_info = response.json()
             logger.info("Access token generated successfully")
+            expires_in = token_info.get('expires_in', 3600)
+            _token_cache[API_KEY] = (token_info['access_token'], time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN)
             return token_info['access_token']
         else:
             logger.error(f"Failed to get access token: {response.status_code} - {response.text}")
@@ -86,39 +388,100 @@ def login_to_asite(email, password):
     st.error(f"❌ Login failed: {response.status_code}")
     return None
 
+def _html_to_text(value):
+    if not value:
+        return ''
+    segments = TAG_RE.split(value)
+    if any('<' in segment for segment in segments):
+        # A '<' left behind means malformed markup; let BeautifulSoup sort it out
+        return BeautifulSoup(value, "html.parser").get_text()
+    texts = []
+    for segment in segments:
+        if not segment:
+            continue
+        segment = unescape(segment)
+        if not segment.strip(HTML_SPACES):
+            # BeautifulSoup collapses whitespace-only text between tags the same way
+            segment = '\n' if '\n' in segment else ' '
+        texts.append(segment)
+    return ''.join(texts)
+
+def _form_to_row(item):
+    """Project an Asite Form dict down to the six fields the reports use."""
+    form_details = item.get('FormDetails', {})
+    created_date = form_details.get('FormCreationDate', None)
+    expected_close_date = form_details.get('UpdateDate', None)
+    form_status = form_details.get('FormStatus', None)
+
+    discipline = None
+    description = None
+    custom_fields = form_details.get('CustomFields', {}).get('CustomField', [])
+    for field in custom_fields:
+        if field.get('FieldName') == 'CFID_DD_DISC':
+            discipline = field.get('FieldValue', None)
+        elif field.get('FieldName') == 'CFID_RTA_DES':
+            description = _html_to_text(field.get('FieldValue', None))
+
+    # 'Days' is filled in by process_json_data once the date columns are parsed
+    return (None, created_date, expected_close_date, description, form_status, discipline)
+
 # Fetch Data Function
 def fetch_project_data(session_id, project_name, form_name, record_limit=1000):
     headers = {"Accept": "application/json", "Content-Type": "application/x-www-form-urlencoded", "Cookie": f"ASessionID={session_id}"}
     all_data = []
-    start_record = 1
     total_records = None
+    max_workers = int(os.getenv("FETCH_WORKERS", 8))
 
      # Capture start time
     start_time = datetime.now()
     st.write(f"🔄 Fetching data from Asite started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"Started fetching data from Asite for project '{project_name}', form '{form_name}' at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
+    # One pooled session shared by all page requests (keep-alive across pages)
+    http = requests.Session()
+    http.mount("https://", HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers))
 
-    with st.spinner("Fetching data from Asite..."):
-        while True:
-            search_criteria = {"criteria": [{"field": "ProjectName", "operator": 1, "values": [project_name]}, {"field": "FormName", "operator": 1, "values": [form_name]}], "recordStart": start_record, "recordLimit": record_limit}
-            search_criteria_str = json.dumps(search_criteria)
-            encoded_payload = f"searchCriteria={urllib.parse.quote(search_criteria_str)}"
-            response = requests.post(SEARCH_URL, headers=headers, data=encoded_payload, verify=certifi.where(), timeout=50)
+    def build_payload(start_record):
+        search_criteria = {"criteria": [{"field": "ProjectName", "operator": 1, "values": [project_name]}, {"field": "FormName", "operator": 1, "values": [form_name]}], "recordStart": start_record, "recordLimit": record_limit}
+        search_criteria_str = json.dumps(search_criteria)
+        return f"searchCriteria={urllib.parse.quote(search_criteria_str)}"
 
-            try:
-                response_json = response.json()
-                if total_records is None:
-                    total_records = response_json.get("responseHeader", {}).get("results-total", 0)
-                all_data.extend(response_json.get("FormList", {}).get("Form", []))
-                st.info(f"🔄 Fetched {len(all_data)} / {total_records} records")
-                if start_record + record_limit - 1 >= total_records:
-                    break
-                start_record += record_limit
-            except Exception as e:
-                logger.error(f"Error fetching data: {str(e)}")
-                st.error(f"❌ Error fetching data: {str(e)}")
-                break
+    def fetch_page(start_record):
+        # Parse the raw bytes (skips requests' charset sniffing) and keep only the projected rows
+        response = http.post(SEARCH_URL, headers=headers, data=build_payload(start_record), verify=certifi.where(), timeout=50)
+        response_json = json.loads(response.content)
+        forms = response_json.get("FormList", {}).get("Form", [])
+        return response_json.get("responseHeader", {}), [_form_to_row(item) for item in forms]
+
+    with st.spinner("Fetching data from Asite..."):
+        # The first page tells us the total; the remaining offsets are then independent
+        encoded_payload = build_payload(1)
+        try:
+            response_header, rows = fetch_page(1)
+            total_records = response_header.get("results-total", 0)
+            all_data.extend(rows)
+            st.info(f"🔄 Fetched {len(all_data)} / {total_records} records")
+        except Exception as e:
+            logger.error(f"Error fetching data: {str(e)}")
+            st.error(f"❌ Error fetching data: {str(e)}")
+        else:
+            offsets = list(range(1 + record_limit, total_records + 1, record_limit))
+            if offsets:
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(offsets))) as executor:
+                    futures = [executor.submit(fetch_page, offset) for offset in offsets]
+                    # Consume in page order so a failure stops at the same point as the sequential loop
+                    for offset, future in zip(offsets, futures):
+                        try:
+                            _, rows = future.result()
+                            all_data.extend(rows)
+                            encoded_payload = build_payload(offset)
+                            st.info(f"🔄 Fetched {len(all_data)} / {total_records} records")
+                        except Exception as e:
+                            logger.error(f"Error fetching data: {str(e)}")
+                            st.error(f"❌ Error fetching data: {str(e)}")
+                            for pending in futures:
+                                pending.cancel()
+                            break
 
     # Capture end time
     end_time = datetime.now()
@@ -129,37 +492,19 @@ def fetch_project_data(session_id, project_name, form_name, record_limit=1000):
 
 # Process JSON Data
 def process_json_data(json_data):
-    data = []
-    for item in json_data:
-        form_details = item.get('FormDetails', {})
-        created_date = form_details.get('FormCreationDate', None)
-        expected_close_date = form_details.get('UpdateDate', None)
-        form_status = form_details.get('FormStatus', None)
-        
-        discipline = None
-        description = None
-        custom_fields = form_details.get('CustomFields', {}).get('CustomField', [])
-        for field in custom_fields:
-            if field.get('FieldName') == 'CFID_DD_DISC':
-                discipline = field.get('FieldValue', None)
-            elif field.get('FieldName') == 'CFID_RTA_DES':
-                description = BeautifulSoup(field.get('FieldValue', None) or '', "html.parser").get_text()
-
-        days_diff = None
-        if created_date and expected_close_date:
-            try:
-                created_date_obj = datetime.strptime(created_date.split('#')[0], "%d-%b-%Y")
-                expected_close_date_obj = datetime.strptime(expected_close_date.split('#')[0], "%d-%b-%Y")
-                days_diff = (expected_close_date_obj - created_date_obj).days
-            except Exception as e:
-                logger.error(f"Error calculating days difference: {str(e)}")
-                days_diff = None
-
-        data.append([days_diff, created_date, expected_close_date, description, form_status, discipline])
+    # fetch_project_data already projects forms to row tuples; raw Form dicts are still accepted
+    data = [item if isinstance(item, tuple) else _form_to_row(item) for item in json_data]
 
-    df = pd.DataFrame(data, columns=['Days', 'Created Date (WET)', 'Expected Close Date (WET)', 'Description', 'Status', 'Discipline'])
+    # Hand pandas one list per column instead of making it transpose the row tuples
+    column_names = ['Days', 'Created Date (WET)', 'Expected Close Date (WET)', 'Description', 'Status', 'Discipline']
+    column_values = list(zip(*data)) or [()] * len(column_names)
+    df = pd.DataFrame({name: list(values) for name, values in zip(column_names, column_values)}, dtype=object)
     df['Created Date (WET)'] = pd.to_datetime(df['Created Date (WET)'].str.split('#').str[0], format="%d-%b-%Y", errors='coerce')
     df['Expected Close Date (WET)'] = pd.to_datetime(df['Expected Close Date (WET)'].str.split('#').str[0], format="%d-%b-%Y", errors='coerce')
+    df['Days'] = (df['Expected Close Date (WET)'] - df['Created Date (WET)']).dt.days
+    # Low-cardinality text columns: comparisons and .str calls then work per category, not per row
+    df['Status'] = df['Status'].astype('category')
+    df['Discipline'] = df['Discipline'].astype('category')
     logger.debug(f"DataFrame columns after processing: {df.columns.tolist()}")
     if df.empty:
         logger.warning("DataFrame is empty after processing")
@@ -168,29 +513,85 @@ def process_json_data(json_data):
 
 # Clean and Parse JSON
 def clean_and_parse_json(text):
-    import re
-    import json
-    
-    json_match = re.search(r'(\{.*\})', text, re.DOTALL)
-    if json_match:
+    """Parse the first JSON object embedded in a WatsonX response, or return None."""
+    if not text:
+        return None
+    # raw_decode parses from the first brace in C and ignores whatever follows the object.
+    # A failed decode is not retried from later braces, so truncated output stays one linear pass.
+    start = text.find('{')
+    if start != -1:
         try:
-            return json.loads(json_match.group(1))
+            return JSON_DECODER.raw_decode(text, start)[0]
         except json.JSONDecodeError:
             pass
-    
-    start_idx = text.find('{')
-    end_idx = text.rfind('}')
-    
-    if start_idx != -1 and end_idx != -1 and start_idx < end_idx:
-        try:
-            json_str = text[start_idx:end_idx+1]
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse JSON even after extraction: {json_str}")
-            
     logger.error(f"Could not extract valid JSON from: {text}")
     return None
 
+def _empty_ncr_site():
+    """Fresh per-tower accumulator for the NCR Open/Closed reports."""
+    return {
+        "Descriptions": [],
+        "Created Date (WET)": [],
+        "Expected Close Date (WET)": [],
+        "Status": [],
+        "Discipline": [],
+        "Pours": [],
+        "SW": 0,
+        "FW": 0,
+        "MEP": 0,
+        "Total": 0,
+        "PoursCount": {}
+    }
+
+def _empty_site():
+    """Fresh per-site Safety accumulator; the field dicts act as ordered sets until the report is returned."""
+    return {"Count": 0, "Descriptions": {}, "Created Date (WET)": {}, "Expected Close Date (WET)": {}, "Status": {}}
+
+def _safety_keyword_mask(desc_lower):
+    """Boolean mask of lower-cased descriptions containing a Safety keyword; NaN never matches."""
+    return desc_lower.str.contains(SAFETY_KEYWORDS_RE, na=False)
+
+def _safety_sites(desc_lower):
+    """Safety site per lower-cased description; a combined tower CommonArea gives a [tower, tower] list to explode."""
+    desc_lower = desc_lower.fillna("")
+    # Cheap literal screens decide which rows each regex can matter for; the rest are NaN, which .str skips
+    joined = desc_lower.str.contains("commonarea", regex=False)
+    area = joined | desc_lower.str.contains("common area", regex=False)
+    # Tower-specific CommonArea (e.g., Eden-Tower-04-CommonArea or Eden-Tower-04-05-CommonArea)
+    common = desc_lower.where(joined).str.extract(TOWER_COMMON_AREA_RE)
+    first = "Eden-Tower " + common[0].str.zfill(2)
+    second = "Eden-Tower " + common[1].str.zfill(2)
+    # Regular tower names only count when no CommonArea variation is mentioned
+    tower = desc_lower.mask(area).str.extract(SAFETY_TOWER_RE, expand=False)
+    sites = ("Eden-Tower " + tower.str.zfill(2)).fillna("Common_Area")
+    sites = sites.where(common[0].isna(), first)
+    return sites.where(common[1].isna(), (first + "|" + second).str.split("|"))
+
+def _extract_pours(description: str) -> list:
+    """Expand pour references in a lower-cased description into sorted ["P1", ...] labels."""
+    if COMMON_AREA_RE.search(description):
+        return ["Common"]
+
+    range_pours = set()
+    listed_pours = set()
+    for match in POURS_RE.finditer(description):
+        start_str, end_str, listed = match.groups()
+        if listed is None:
+            start_num, end_num = int(start_str), int(end_str)
+            if start_num <= end_num and end_num - start_num <= 20:  # Reasonable limit
+                range_pours.update(range(start_num, end_num + 1))
+                continue
+            # An unusable range still names its first pour, as a list would ("p 9-2" -> P9)
+            listed = LIST_RE.match(description, match.start()).group(1)
+        listed_pours.update(num for num in map(int, DIGITS_RE.findall(listed)) if num <= 50)
+
+    # Valid ranges take precedence over lists; individual references are the last resort
+    pours = range_pours or listed_pours
+    if not pours:
+        pours = {num for num in map(int, INDIV_RE.findall(description)) if num <= 50}
+    return sorted(f"P{num}" for num in pours) if pours else ["Common"]
+
+
 # Generate NCR Report
 
 
@@ -240,22 +641,20 @@ def generate_ncr_report_for_eden(df: pd.DataFrame, report_type: str, start_date=
                     return {"error": "Invalid date range"}, ""
 
                 df = df[df['Expected Close Date (WET)'].notna()]
+                created = pd.to_datetime(df['Created Date (WET)'])
                 
                 # Ensure 'Days' column exists or calculate it
                 if 'Days' not in df.columns:
                     try:
-                        df['Days'] = (pd.to_datetime(df['Expected Close Date (WET)']) - pd.to_datetime(df['Created Date (WET)'])).dt.days
+                        df['Days'] = (pd.to_datetime(df['Expected Close Date (WET)']) - created).dt.days
                     except Exception as e:
                         logger.error(f"Error calculating Days column: {str(e)}")
                         st.error(f"❌ Error calculating Days: {str(e)}")
                         return {"error": "Error calculating Days"}, ""
                 
-                filtered_df = df[
-                    (df['Status'] == 'Closed') &
-                    (pd.to_datetime(df['Created Date (WET)']) >= start_date) &
-                    (pd.to_datetime(df['Created Date (WET)']) <= end_date) &
-                    (pd.to_numeric(df['Days'], errors='coerce') > 21)
-                ].copy()
+                days = pd.to_numeric(df['Days'], errors='coerce')
+                mask = (df['Status'].values == 'Closed') & (created >= start_date) & (created <= end_date) & (days > 21)
+                filtered_df = df[mask].copy()
                 
             else:  # Open report
                 if until_date is None:  # Changed from Until_Date to until_date
@@ -287,176 +686,101 @@ def generate_ncr_report_for_eden(df: pd.DataFrame, report_type: str, start_date=
                 st.warning(f"No {report_type} NCRs found with duration > 21 days. Try adjusting the date range or criteria.")
                 return {"error": f"No {report_type} records found with duration > 21 days"}, ""
 
-            # Safe string conversion
+            # Safe string conversion; the columns are replaced (not .loc-assigned) so the strings are not cast back to datetimes
             try:
-                filtered_df.loc[:, 'Created Date (WET)'] = filtered_df['Created Date (WET)'].astype(str)
+                filtered_df['Created Date (WET)'] = filtered_df['Created Date (WET)'].astype(str)
                 if 'Expected Close Date (WET)' in filtered_df.columns:
-                    filtered_df.loc[:, 'Expected Close Date (WET)'] = filtered_df['Expected Close Date (WET)'].astype(str)
+                    filtered_df['Expected Close Date (WET)'] = filtered_df['Expected Close Date (WET)'].astype(str)
             except Exception as e:
                 logger.error(f"Error converting dates to string: {str(e)}")
                 st.error(f"❌ Error converting dates: {str(e)}")
                 return {"error": "Error converting dates"}, ""
 
-            processed_data = filtered_df.to_dict(orient="records")
-            
-            cleaned_data = []
-            unique_records = []
-
-            # Pre-compile regex patterns for better performance
-            common_pattern = re.compile(r"common area|flat\s*no", re.IGNORECASE)
-
-            for record in processed_data:
-                try:
-                    cleaned_record = {
-                        "Description": str(record.get("Description", "")),
-                        "Discipline": str(record.get("Discipline", "")),
-                        "Created Date (WET)": str(record.get("Created Date (WET)", "")),
-                        "Expected Close Date (WET)": str(record.get("Expected Close Date (WET)", "")),
-                        "Status": str(record.get("Status", "")),
-                        "Days": int(record.get("Days", 0)) if pd.notna(record.get("Days")) else 0,
-                        "Tower": "External Development"
-                    }
-                    
-                    if report_type == "Open":
-                        cleaned_record["Days_From_Today"] = int(record.get("Days_From_Today", 0)) if pd.notna(record.get("Days_From_Today")) else 0
+            # Column-wise cleaning: every step below runs over whole Series instead of per record
+            def as_str(column):
+                if column not in filtered_df.columns:
+                    return pd.Series("", index=filtered_df.index)
+                values = filtered_df[column]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    # Categoricals store missing cells as NaN; keep them reading 'None' like object columns
+                    values = values.astype(object).where(values.notna(), None)
+                # astype(str) on an object column converts in one Cython pass with str() semantics
+                return values.astype(object).astype(str)
+
+            def as_int(column):
+                return pd.to_numeric(filtered_df[column], errors='coerce').fillna(0).astype(int)
+
+            description = as_str("Description")
+            desc_lower = description.str.lower()
+            discipline = as_str("Discipline").str.strip().str.lower()
+
+            # Skip empty descriptions, missing disciplines and HSE records entirely
+            keep = (desc_lower != "") & (discipline != "none") & (discipline != "") & ~discipline.str.contains("hse", regex=False)
+            skipped = int((~keep).sum())
+            if skipped:
+                logger.debug(f"Skipping {skipped} records with empty description, invalid discipline or HSE")
+
+            filtered_df = filtered_df[keep]
+            description, desc_lower, discipline = description[keep], desc_lower[keep], discipline[keep]
+
+            discipline_category = np.select(
+                [
+                    discipline.str.contains("structure|sw", regex=True),
+                    discipline.str.contains("civil|finishing|fw", regex=True),
+                ],
+                ["SW", "FW"],
+                default="MEP",
+            )
 
-                    description = cleaned_record["Description"].lower()
+            # Tower categorization. Tower numbers repeat across rows, so each distinct one is
+            # formatted once through its category; combined labels are only built where matched.
+            tower_num = desc_lower.str.extract(TOWER_RE)[0].str.zfill(2).astype("category")
+            tower_label = tower_num.cat.rename_categories(lambda num: f"Eden-Tower-{num}")
+            multi_tower = desc_lower.str.extract(MULTI_TOWER_RE).dropna()
+            multi_label = ("Eden-Tower-" + multi_tower[0].str.zfill(2) + "-" + multi_tower[1].str.zfill(2) + "-CommonArea").reindex(desc_lower.index)
+            tower = np.select(
+                [
+                    desc_lower.str.contains(CLUBHOUSE_RE),
+                    multi_label.notna(),
+                    desc_lower.str.contains("common area", regex=False),
+                    tower_label.notna(),
+                ],
+                [
+                    "Eden-Club",
+                    multi_label,
+                    "Common_Area",
+                    tower_label.astype(object),
+                ],
+                default="Common_Area",
+            )
 
-                    if not description:
-                        continue 
-                    
-                    # FIXED POUR EXTRACTION LOGIC
-                    if common_pattern.search(description):
-                        cleaned_record["Pours"] = ["Common"]
-                    else:
-                        pours = set()
-                        
-                        # Pattern 1: Handle ranges like "1 to 8", "1-8", "5 to 10"
-                        range_pattern = r"(?:pour|p)[-\s]*(\d+)[-\s]*(?:to|-)[-\s]*(\d+)"
-                        range_matches = re.findall(range_pattern, description, re.IGNORECASE)
-                        
-                        for start_str, end_str in range_matches:
-                            try:
-                                start_num = int(start_str)
-                                end_num = int(end_str)
-                                if start_num <= end_num and end_num - start_num <= 20:  # Reasonable limit
-                                    pours.update(f"P{i}" for i in range(start_num, end_num + 1))
-                            except ValueError:
-                                continue
-                        
-                        # Pattern 2: Handle comma/and separated lists like "1,2, 3 & 4", "1, 2 and 3"
-                        if not pours:
-                            list_pattern = r"(?:pour|p)[-\s]*([0-9,\s&and]+)"
-                            list_matches = re.findall(list_pattern, description, re.IGNORECASE)
-                            
-                            for match in list_matches:
-                                # Extract all individual numbers from the matched string
-                                numbers = re.findall(r'\d+', match)
-                                for num_str in numbers:
-                                    try:
-                                        num = int(num_str)
-                                        if num <= 50:  # Reasonable pour number limit
-                                            pours.add(f"P{num}")
-                                    except ValueError:
-                                        continue
-                        
-                        # Pattern 3: Handle individual pour references like "P1", "pour 5"
-                        if not pours:
-                            # More specific pattern to avoid matching numbers that are part of other contexts
-                            individual_pattern = r"(?:pour|p)[-\s]*(\d+)(?!\s*(?:to|-)\s*\d+)"
-                            individual_matches = re.findall(individual_pattern, description, re.IGNORECASE)
-                            
-                            for num_str in individual_matches:
-                                try:
-                                    num = int(num_str)
-                                    if num <= 50:
-                                        pours.add(f"P{num}")
-                                except ValueError:
-                                    continue
-                        
-                        cleaned_record["Pours"] = sorted(list(pours)) if pours else ["Common"]
-                
-                    # Initialize Discipline_Category
-                    discipline = cleaned_record["Discipline"].strip().lower()
-                    if discipline == "none" or not discipline:
-                        logger.debug(f"Skipping record with invalid discipline: {discipline}")
-                        continue
-                    elif "hse" in discipline:
-                        logger.debug(f"Skipping HSE record: {discipline}")
-                        cleaned_record["Discipline_Category"] = "HSE"
-                        continue  # Skip HSE records entirely
-                    elif "structure" in discipline or "sw" in discipline:
-                        cleaned_record["Discipline_Category"] = "SW"
-                    elif "civil" in discipline or "finishing" in discipline or "fw" in discipline:
-                        cleaned_record["Discipline_Category"] = "FW"
-                    else:
-                        cleaned_record["Discipline_Category"] = "MEP"
-                        
-                    unique_records.append(cleaned_record["Description"])
-                        
-                    unique_records.append(cleaned_record["Description"])
-                    # Check for duplicates based on Description
-                    # Tower categorization
-                    if any(phrase in description for phrase in ["eden clubhouse", "eden-clubhouse", "eden club"]):
-                        cleaned_record["Tower"] = "Eden-Club"
-                        logger.debug(f"Matched 'Eden Clubhouse' in description: {description}")
-                        cleaned_data.append(cleaned_record)
-                    else:
-                        tower_matches = re.findall(r"(tower|t)\s*-?\s*(\d+)", description, re.IGNORECASE)
-                        multiple_tower_pattern = re.search(
-                            r"(tower|t)\s*-?\s*(\d+)\s*([,&]|and)\s*(tower|t)?\s*-?\s*(\d+)",
-                            description,
-                            re.IGNORECASE
-                        )
-                        flat_no_pattern = re.search(r"flat\s*no", description, re.IGNORECASE)
-                        
-                        # --- Corrected Code ---
-# ...
-                        if multiple_tower_pattern:
-                            # Handles cases like "Tower 4 and Tower 5"
-                            tower1 = multiple_tower_pattern.group(2).zfill(2)
-                            tower2 = multiple_tower_pattern.group(5).zfill(2)
-                            cleaned_record["Tower"] = f"Eden-Tower-{tower1}-{tower2}-CommonArea"
-                            cleaned_data.append(cleaned_record)
-                            logger.debug(f"Added combined tower record for Eden-Tower-{tower1}-{tower2}-CommonArea: {description}")
-                        
-                        elif "common area" in description:
-                            # PRIORITIZES "common area" keyword, even if a tower is mentioned
-                            cleaned_record["Tower"] = "Common_Area"
-                            cleaned_data.append(cleaned_record)
-                            logger.debug(f"Assigned Common_Area due to keyword: {description}")
-                        
-                        elif flat_no_pattern and tower_matches:
-                            # Handles cases like "flat no in tower 4"
-                            tower_num = tower_matches[0][1].zfill(2)
-                            cleaned_record["Tower"] = f"Eden-Tower-{tower_num}"
-                            cleaned_data.append(cleaned_record)
-                            logger.debug(f"Assigned Eden-Tower-{tower_num} for Flat no description: {description}")
-
-                        elif tower_matches:
-                            # Catches descriptions that only mention a tower number
-                            tower_num = tower_matches[0][1].zfill(2)
-                            cleaned_record["Tower"] = f"Eden-Tower-{tower_num}"
-                            logger.debug(f"Single tower match: Eden-Tower-{tower_num}")
-                            cleaned_data.append(cleaned_record)
-                            
-                        else:
-                            # Default for descriptions with no tower mentioned
-                            cleaned_record["Tower"] = "Common_Area"
-                            cleaned_data.append(cleaned_record)
-                            logger.debug(f"Assigned Common_Area as default: {description}")
-                            
-                except Exception as e:
-                    logger.error(f"Error processing record: {record}, error: {str(e)}")
-                    continue
-            
-            # Remove duplicates
-            try:
-                cleaned_data = [dict(t) for t in {tuple(sorted(d.items())) for d in cleaned_data}]
-            except Exception as e:
-                logger.error(f"Error removing duplicates: {str(e)}")
-                # If deduplication fails, continue with original data
-                pass
+            cleaned_columns = {
+                "Description": description,
+                "Discipline": as_str("Discipline"),
+                "Created Date (WET)": as_str("Created Date (WET)"),
+                "Expected Close Date (WET)": as_str("Expected Close Date (WET)"),
+                "Status": as_str("Status"),
+                "Days": as_int("Days") if "Days" in filtered_df.columns else 0,
+                "Tower": tower,
+            }
+            if report_type == "Open":
+                cleaned_columns["Days_From_Today"] = as_int("Days_From_Today")
+            # Pour ranges are the only part that still needs Python; run it once per distinct description
+            pour_lookup = {desc: _extract_pours(desc) for desc in desc_lower.unique()}
+            cleaned_columns["Pours"] = desc_lower.map(lambda desc: list(pour_lookup[desc]))
+            cleaned_columns["Discipline_Category"] = discipline_category
+
+            cleaned_data = pd.DataFrame(cleaned_columns, index=filtered_df.index).to_dict(orient="records")
+
+            # Remove duplicates (records share one key order, so the values alone identify a record)
+            seen = set()
+            unique_data = []
+            for record in cleaned_data:
+                key = tuple(tuple(value) if isinstance(value, list) else value for value in record.values())
+                if key not in seen:
+                    seen.add(key)
+                    unique_data.append(record)
+            cleaned_data = unique_data
 
             if not cleaned_data:
                 return {report_type: {"Sites": {}, "Grand_Total": 0}}, ""
@@ -473,182 +797,139 @@ def generate_ncr_report_for_eden(df: pd.DataFrame, report_type: str, start_date=
             all_results = {report_type: {"Sites": {}, "Grand_Total": 0}}
             chunk_size = int(os.getenv("CHUNK_SIZE", 20))
             
-            for i in range(0, len(cleaned_data), chunk_size):
-                chunk = cleaned_data[i:i + chunk_size]
-                
-                # Capture and log start time
-                start_time = datetime.now()
-                st.write(f" 🔄 Processing chunk {i // chunk_size + 1}: Records {i} to {min(i + chunk_size, len(cleaned_data))} started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"Started chunk {i // chunk_size + 1} at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Log data sent to WatsonX
-                logger.info(f"Data sent to WatsonX for {report_type} chunk {i // chunk_size + 1}: {json.dumps(chunk, indent=2)}")
-
-                # Log the total number of records being processed
-                total_records = len(cleaned_data)
-                st.write(f"Total {report_type} records to process: {total_records}")
-                logger.info(f"Total {report_type} records to process: {total_records}")
-
-                prompt = (
-                    "IMPORTANT: RETURN ONLY A SINGLE VALID JSON OBJECT WITH THE EXACT FIELDS SPECIFIED BELOW. "
-                    "DO NOT GENERATE ANY CODE (e.g., Python, JavaScript). "
-                    "DO NOT INCLUDE ANY TEXT, EXPLANATIONS, OR MULTIPLE RESPONSES OUTSIDE THE JSON OBJECT. "
-                    "DO NOT WRAP THE JSON IN CODE BLOCKS (e.g., ```json). "
-                    "RETURN THE JSON OBJECT DIRECTLY.\n\n"
-                    f"Task: Group the provided data by 'Tower' and collect 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status', 'Discipline', and 'Pours' into arrays. "
-                    f"Count the records by 'Discipline_Category' ('SW', 'FW', 'MEP'), calculate the 'Total' for each 'Tower', and count occurrences of each pour within 'Pours' (e.g., P1, P2). "
-                    f"Process ALL {len(chunk)} records provided in the data.\n"
-                    f"Use 'Tower' values (e.g., 'Eden-Tower-04-CommonArea', 'Eden-Tower-07-CommonArea', 'Common_Area'), "
-                    f"'Discipline_Category' values (e.g., 'SW', 'FW', 'MEP'), and provided 'Pours' values. Count each record exactly once.\n\n"
-                    "REQUIRED OUTPUT FORMAT (ONLY THESE FIELDS):\n"
-                    "{\n"
-                    f'  "{report_type}": {{\n'
-                    '    "Sites": {\n'
-                    '      "Site_Name1": {\n'
-                    '        "Descriptions": ["description1", "description2"],\n'
-                    '        "Created Date (WET)": ["date1", "date2"],\n'
-                    '        "Expected Close Date (WET)": ["date1", "date2"],\n'
-                    '        "Status": ["status1", "status2"],\n'
-                    '        "Discipline": ["discipline1", "discipline2"],\n'
-                    '        "Pours": [["pour1a", "pour1b"], ["pour2"]],\n'
-                    '        "SW": number,\n'
-                    '        "FW": number,\n'
-                    '        "MEP": number,\n'
-                    '        "Total": number,\n'
-                    '        "PoursCount": {"pour1": count1, "pour2": count2}\n'
-                    '      }\n'
-                    '    },\n'
-                    f'    "Grand_Total": {len(chunk)}\n'
-                    '  }\n'
-                    '}\n\n'
-                    f"Data: {json.dumps(chunk)}\n"
-                    f"IMPORTANT: Ensure the JSON is valid and contains all required fields. "    
-                    f"Return the result strictly as a JSON object—no code, no explanations, only the JSON.Dont put <|eom_id|> or any other markers in the JSON output. Grand_Total must be {len(chunk)}."
-                )
+            chunks = [cleaned_data[i:i + chunk_size] for i in range(0, len(cleaned_data), chunk_size)]
+            headers = {
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {access_token}"
+            }
 
-                payload = {
-                    "input": prompt,
-                    "parameters": {
-                        "decoding_method": "greedy",
-                        "max_new_tokens": 5100,
-                        "min_new_tokens": 0,
-                        "temperature": 0.0
-                    },
-                    "model_id": MODEL_ID,
-                    "project_id": PROJECT_ID
-                }
-                headers = {
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {access_token}"
-                }
+            def post_chunk(payload, record_count):
+                started = datetime.now()
+                response = _post_watsonx_cached(_watsonx_http, payload, headers=headers, verify=certifi.where(), timeout=1000)
+                logger.info("WatsonX API call took %s seconds for %d records", (datetime.now() - started).total_seconds(), record_count)
+                return response
 
-                retry_strategy = Retry(
-                    total=3,
-                    backoff_factor=1,
-                    status_forcelist=[429, 500, 502, 503, 504],
-                    allowed_methods=["POST"]
-                )
-                adapter = HTTPAdapter(max_retries=retry_strategy)
-                http = requests.Session()
-                http.mount("https://", adapter)
+            def fall_back(chunk, error_msg):
+                """Report a chunk whose WatsonX call failed and count it locally instead."""
+                st.error(error_msg)
+                logger.error(error_msg)
+                st.write("Falling back to local count for this chunk")
+                process_chunk_locally(chunk, all_results, report_type)
+
+            # Log the total number of records being processed
+            total_records = len(cleaned_data)
+            st.write(f"Total {report_type} records to process: {total_records}")
+            logger.info("Total %s records to process: %d", report_type, total_records)
+
+            # Chunks are independent, so their WatsonX calls overlap; responses are merged in chunk order.
+            # Each chunk is submitted as soon as its prompt is built, so requests start while later prompts are serialized.
+            max_workers = min(WATSONX_WORKERS, len(chunks))
+            start_time = datetime.now()
+            # One progress bar for the whole run instead of several st.write lines per chunk
+            progress_bar = st.progress(0, text=f"Processing {len(chunks)} {report_type} chunks...")
+            # Formatted prompt head and tail per chunk size; only a short last chunk needs a second pair
+            prompt_frames = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = []
+                for chunk_number, chunk in enumerate(chunks, start=1):
+                    i = (chunk_number - 1) * chunk_size
+                    logger.info("Prepared chunk %d: records %d to %d", chunk_number, i, min(i + chunk_size, total_records))
+
+                    # Serialize once; the same text goes into the prompt and, at DEBUG, the log
+                    chunk_json = json.dumps(chunk)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Data sent to WatsonX for %s chunk %d: %s", report_type, chunk_number, chunk_json)
+
+                    prompt_parts = prompt_frames.get(len(chunk))
+                    if prompt_parts is None:
+                        prompt_parts = prompt_frames[len(chunk)] = (
+                            NCR_PROMPT_HEAD.format(report_type=report_type, record_count=len(chunk)),
+                            NCR_PROMPT_TAIL.format(report_type=report_type, record_count=len(chunk)),
+                        )
+                    prompt = prompt_parts[0] + chunk_json + prompt_parts[1]
+
+                    payload = {
+                        "input": prompt,
+                        "parameters": {
+                            "decoding_method": "greedy",
+                            "max_new_tokens": 5100,
+                            "min_new_tokens": 0,
+                            "temperature": 0.0,
+                            "stop_sequences": WATSONX_STOP_SEQUENCES
+                        },
+                        "model_id": MODEL_ID,
+                        "project_id": PROJECT_ID
+                    }
+                    futures.append(executor.submit(post_chunk, payload, len(chunk)))
 
-                try:
-                    start_time = datetime.now()
-                    response = http.post(WATSONX_API_URL, headers=headers, json=payload, verify=certifi.where(), timeout=1000)
-                    logger.info(f"WatsonX API call took {(datetime.now() - start_time).total_seconds()} seconds for {len(chunk)} records")
-                    st.write(f"Debug - Response status code: {response.status_code}")
-
-                    if response.status_code == 200:
-                        api_result = response.json()
-                        generated_text = api_result.get("results", [{}])[0].get("generated_text", "").strip()
-                        short_text = generated_text[:200] + "..." if len(generated_text) > 200 else generated_text
-                        logger.debug(f"Parsed generated text: {generated_text}")
-
-                        parsed_json = clean_and_parse_json(generated_text)
-                        if parsed_json and report_type in parsed_json:
-                            chunk_result = parsed_json[report_type]
-                            st.write(f"Processing API response for chunk {i // chunk_size + 1} with {len(chunk)} records")
+                for chunk_number, (chunk, future) in enumerate(zip(chunks, futures), start=1):
+                    try:
+                        cache_key, generated_text, response = future.result()
+                        if response is not None:
+                            logger.debug("Response status code for chunk %d: %s", chunk_number, response.status_code)
+
+                        if generated_text is not None:
+                            logger.debug("Parsed generated text: %s", generated_text)
+
+                            parsed_json = clean_and_parse_json(generated_text)
+                            if parsed_json and report_type in parsed_json:
+                                chunk_result = parsed_json[report_type]
                             
-                            for site, data in chunk_result["Sites"].items():
-                                if site not in all_results[report_type]["Sites"]:
-                                    all_results[report_type]["Sites"][site] = {
-                                        "Descriptions": [],
-                                        "Created Date (WET)": [],
-                                        "Expected Close Date (WET)": [],
-                                        "Status": [],
-                                        "Discipline": [],
-                                        "Pours": [],
-                                        "SW": 0,
-                                        "FW": 0,
-                                        "MEP": 0,
-                                        "Total": 0,
-                                        "PoursCount": {}
-                                    }
-                                all_results[report_type]["Sites"][site]["Descriptions"].extend(data["Descriptions"])
-                                all_results[report_type]["Sites"][site]["Created Date (WET)"].extend(data["Created Date (WET)"])
-                                all_results[report_type]["Sites"][site]["Expected Close Date (WET)"].extend(data["Expected Close Date (WET)"])
-                                all_results[report_type]["Sites"][site]["Status"].extend(data["Status"])
-                                all_results[report_type]["Sites"][site]["Discipline"].extend(data["Discipline"])
-                                all_results[report_type]["Sites"][site]["Pours"].extend(data["Pours"])
-                                all_results[report_type]["Sites"][site]["SW"] += data["SW"]
-                                all_results[report_type]["Sites"][site]["FW"] += data["FW"]
-                                all_results[report_type]["Sites"][site]["MEP"] += data["MEP"]
-                                all_results[report_type]["Sites"][site]["Total"] += data["Total"]
-                                for pour, count in data["PoursCount"].items():
-                                    all_results[report_type]["Sites"][site]["PoursCount"][pour] = all_results[report_type]["Sites"][site]["PoursCount"].get(pour, 0) + count
+                                sites = all_results[report_type]["Sites"]
+                                for site, data in chunk_result["Sites"].items():
+                                    bucket = sites.setdefault(site, _empty_ncr_site())
+                                    bucket["Descriptions"].extend(data["Descriptions"])
+                                    bucket["Created Date (WET)"].extend(data["Created Date (WET)"])
+                                    bucket["Expected Close Date (WET)"].extend(data["Expected Close Date (WET)"])
+                                    bucket["Status"].extend(data["Status"])
+                                    bucket["Discipline"].extend(data["Discipline"])
+                                    bucket["Pours"].extend(data["Pours"])
+                                    bucket["SW"] += data["SW"]
+                                    bucket["FW"] += data["FW"]
+                                    bucket["MEP"] += data["MEP"]
+                                    bucket["Total"] += data["Total"]
+                                    pours_count = bucket["PoursCount"]
+                                    for pour, count in data["PoursCount"].items():
+                                        pours_count[pour] = pours_count.get(pour, 0) + count
                             
-                            # Use the actual number of records processed instead of API count
-                            all_results[report_type]["Grand_Total"] += len(chunk)
-                            st.write(f"Successfully processed chunk {i // chunk_size + 1} with {len(chunk)} records")
+                                # Use the actual number of records processed instead of API count
+                                all_results[report_type]["Grand_Total"] += len(chunk)
+                                _remember_watsonx_text(cache_key, generated_text)
+                                logger.info("Successfully processed chunk %d with %d records", chunk_number, len(chunk))
+                            else:
+                                logger.error("No valid JSON found in response")
+                                st.write("Falling back to local count for this chunk")
+                                process_chunk_locally(chunk, all_results, report_type)
                         else:
-                            logger.error("No valid JSON found in response")
-                            st.write("Falling back to local count for this chunk")
-                            process_chunk_locally(chunk, all_results, report_type)
-                    else:
-                        error_msg = f"❌ WatsonX API error: {response.status_code} - {response.text}"
-                        st.error(error_msg)
-                        logger.error(error_msg)
-                        st.write("Falling back to local count for this chunk")
-                        process_chunk_locally(chunk, all_results, report_type)
+                            fall_back(chunk, f"❌ WatsonX API error: {response.status_code} - {response.text}")
                         
-                except requests.RequestException as e:
-                    error_msg = f"❌ Request exception during WatsonX call: {str(e)}"
-                    st.error(error_msg)
-                    logger.error(error_msg)
-                    st.write("Falling back to local count for this chunk")
-                    process_chunk_locally(chunk, all_results, report_type)
-                except Exception as e:
-                    error_msg = f"❌ Exception during WatsonX call: {str(e)}"
-                    st.error(error_msg)
-                    logger.error(error_msg)
-                    st.write("Falling back to local count for this chunk")
-                    process_chunk_locally(chunk, all_results, report_type)
-
-                end_time = datetime.now()
-                st.write(f"🔄 Chunk {i // chunk_size + 1} model processing for {report_type} completed at {end_time.strftime('%Y-%m-%d %H:%M:%S')} (Duration: {(end_time - start_time).total_seconds()} seconds)")
-                logger.info(f"Finished model processing chunk {i // chunk_size + 1} for {report_type} at {end_time.strftime('%Y-%m-%d %H:%M:%S')} (Duration: {(end_time - start_time).total_seconds()} seconds)")
-
-            table_data = []
-            for site, data in all_results[report_type]["Sites"].items():
-                row = {
-                    "Site": site,
-                    "SW Count": data["SW"],
-                    "FW Count": data["FW"],
-                    "MEP Count": data["MEP"],
-                    "Total Records": data["Total"],
-                    "Pours Count": json.dumps(data["PoursCount"], indent=2),
-                    "Descriptions": "; ".join(data["Descriptions"]),
-                    "Created Dates": "; ".join(data["Created Date (WET)"]),
-                    "Expected Close Dates": "; ".join(data["Expected Close Date (WET)"]),
-                    "Statuses": "; ".join(data["Status"]),
-                    "Disciplines": "; ".join(data["Discipline"]),
-                    "Pours": "; ".join([", ".join(m) for m in data["Pours"]])
-                }
-                table_data.append(row)
-            
-            if table_data:
-                df_table = pd.DataFrame(table_data)
+                    except requests.RequestException as e:
+                        fall_back(chunk, f"❌ Request exception during WatsonX call: {str(e)}")
+                    except Exception as e:
+                        fall_back(chunk, f"❌ Exception during WatsonX call: {str(e)}")
+
+                    progress_bar.progress(chunk_number / len(chunks), text=f"Processed chunk {chunk_number}/{len(chunks)} for {report_type}")
+                    logger.info("Finished model processing chunk %d for %s (Duration: %s seconds)", chunk_number, report_type, (datetime.now() - start_time).total_seconds())
+
+            sites = all_results[report_type]["Sites"]
+            if sites:
+                # Build the summary straight from the per-site accumulators, joining list columns column-wise
+                site_frame = pd.DataFrame(list(sites.values()))
+                df_table = pd.DataFrame({
+                    "Site": list(sites),
+                    "SW Count": site_frame["SW"],
+                    "FW Count": site_frame["FW"],
+                    "MEP Count": site_frame["MEP"],
+                    "Total Records": site_frame["Total"],
+                    "Pours Count": site_frame["PoursCount"].map(json.dumps),
+                    "Descriptions": site_frame["Descriptions"].map("; ".join),
+                    "Created Dates": site_frame["Created Date (WET)"].map("; ".join),
+                    "Expected Close Dates": site_frame["Expected Close Date (WET)"].map("; ".join),
+                    "Statuses": site_frame["Status"].map("; ".join),
+                    "Disciplines": site_frame["Discipline"].map("; ".join),
+                    "Pours": site_frame["Pours"].map(lambda pours: "; ".join(", ".join(m) for m in pours))
+                })
                 st.write(f"Final {report_type} Results:")
                 st.dataframe(df_table, use_container_width=True)
             else:
@@ -665,46 +946,53 @@ def generate_ncr_report_for_eden(df: pd.DataFrame, report_type: str, start_date=
         st.error(f"❌ Unexpected Error: {str(e)}")
         return {"error": f"Unexpected Error: {str(e)}"}, ""
 
-@st.cache_data
 def process_chunk_locally(chunk, all_results, report_type):
     """Helper function to process chunks locally when API fails"""
+    # Not cached: this merges into all_results in place, so a cache hit would silently skip the merge
     try:
-        for record in chunk:
-            tower = record.get("Tower", "Unknown")
-            discipline = record.get("Discipline_Category", "Unknown")
-            pours = record.get("Pours", ["Common"])
-            
-            if tower not in all_results[report_type]["Sites"]:
-                all_results[report_type]["Sites"][tower] = {
-                    "Descriptions": [],
-                    "Created Date (WET)": [],
-                    "Expected Close Date (WET)": [],
-                    "Status": [],
-                    "Discipline": [],
-                    "Pours": [],
-                    "SW": 0,
-                    "FW": 0,
-                    "MEP": 0,
-                    "Total": 0,
-                    "PoursCount": {}
-                }
-            
-            all_results[report_type]["Sites"][tower]["Descriptions"].append(record.get("Description", ""))
-            all_results[report_type]["Sites"][tower]["Created Date (WET)"].append(record.get("Created Date (WET)", ""))
-            all_results[report_type]["Sites"][tower]["Expected Close Date (WET)"].append(record.get("Expected Close Date (WET)", ""))
-            all_results[report_type]["Sites"][tower]["Status"].append(record.get("Status", ""))
-            all_results[report_type]["Sites"][tower]["Discipline"].append(record.get("Discipline", ""))
-            all_results[report_type]["Sites"][tower]["Pours"].append(pours)
-            
-            if discipline in ["SW", "FW", "MEP"]:
-                all_results[report_type]["Sites"][tower][discipline] += 1
-            
-            all_results[report_type]["Sites"][tower]["Total"] += 1
-            
-            for pour in pours:
-                all_results[report_type]["Sites"][tower]["PoursCount"][pour] = all_results[report_type]["Sites"][tower]["PoursCount"].get(pour, 0) + 1
-                
-            all_results[report_type]["Grand_Total"] += 1
+        if not chunk:
+            return
+
+        records = pd.DataFrame(chunk)
+        for column, default in [("Tower", "Unknown"), ("Discipline_Category", "Unknown"), ("Description", ""),
+                                ("Created Date (WET)", ""), ("Expected Close Date (WET)", ""), ("Status", ""), ("Discipline", "")]:
+            if column not in records.columns:
+                records[column] = default
+        if "Pours" not in records.columns:
+            records["Pours"] = [["Common"]] * len(records)
+
+        # One groupby pass builds every per-tower list and count
+        grouped = records.groupby("Tower", sort=False)
+        site_lists = grouped.agg(
+            Descriptions=("Description", list),
+            Created=("Created Date (WET)", list),
+            Expected=("Expected Close Date (WET)", list),
+            Status=("Status", list),
+            Discipline=("Discipline", list),
+            Pours=("Pours", list),
+        )
+        totals = grouped.size()
+        category_counts = pd.crosstab(records["Tower"], records["Discipline_Category"]).reindex(columns=["SW", "FW", "MEP"], fill_value=0)
+        pour_counts = records[["Tower", "Pours"]].explode("Pours").groupby(["Tower", "Pours"], sort=False).size()
+
+        sites = all_results[report_type]["Sites"]
+        for tower, lists in site_lists.iterrows():
+            site = sites.setdefault(tower, _empty_ncr_site())
+            site["Descriptions"].extend(lists["Descriptions"])
+            site["Created Date (WET)"].extend(lists["Created"])
+            site["Expected Close Date (WET)"].extend(lists["Expected"])
+            site["Status"].extend(lists["Status"])
+            site["Discipline"].extend(lists["Discipline"])
+            site["Pours"].extend(lists["Pours"])
+            for category in ["SW", "FW", "MEP"]:
+                site[category] += int(category_counts.at[tower, category])
+            site["Total"] += int(totals[tower])
+
+        for (tower, pour), count in pour_counts.items():
+            pours_count = sites[tower]["PoursCount"]
+            pours_count[pour] = pours_count.get(pour, 0) + int(count)
+
+        all_results[report_type]["Grand_Total"] += len(records)
             
     except Exception as e:
         logger.error(f"Error in local processing: {str(e)}")
@@ -712,90 +1000,88 @@ def process_chunk_locally(chunk, all_results, report_type):
 
 # Generate NCR Housekeeping Report
 
-@st.cache_data
 def generate_ncr_Housekeeping_report_for_eden(df, report_type, start_date=None, end_date=None, until_date=None):
     """Generate Housekeeping NCR report for Open or Closed records."""
+    # Today's date is part of the cache key, so the Open report's 7-day cut-off moves with the calendar
+    return _generate_ncr_Housekeeping_report(df, report_type, start_date, end_date, until_date, datetime.today().strftime('%Y/%m/%d'))
+
+@st.cache_data
+def _generate_ncr_Housekeeping_report(df, report_type, start_date, end_date, until_date, today):
     with st.spinner(f"Generating {report_type} Housekeeping NCR Report..."):
         try:
-            today = pd.to_datetime(datetime.today().strftime('%Y/%m/%d'))
+            today = pd.to_datetime(today)
             closed_start = pd.to_datetime(start_date) if start_date else None
             closed_end = pd.to_datetime(end_date) if end_date else None
             open_until = pd.to_datetime(until_date) if until_date else None
             
-            # (Your housekeeping_keywords and is_housekeeping_record function remain the same)
-            housekeeping_keywords = [
-                'housekeeping', 'cleaning', 'cleanliness', 'waste disposal', 'waste management', 'garbage', 'trash',
-                'rubbish', 'debris', 'litter', 'dust', 'untidy', 'cluttered', 'accumulation of waste', 'construction waste',
-                'pile of garbage', 'poor housekeeping', 'material storage', 'construction debris', 'cleaning schedule',
-                'garbage collection', 'waste bins', 'dirty', 'mess', 'unclean', 'disorderly', 'dirty floor',
-                'waste disposal area', 'waste collection', 'cleaning protocol', 'sanitation', 'trash removal',
-                'waste accumulation', 'unkept area', 'refuse collection', 'workplace cleanliness'
-            ]
-            safety_keywords = ['safety precautions', 'PPE', 'fall protection', 'safety belts', 'barricades']
-            def is_housekeeping_record(description):
-                if pd.isna(description): return False
-                try:
-                    description_lower = str(description).strip().lower()
-                    if not description_lower: return False
-                    has_housekeeping = any(keyword in description_lower for keyword in housekeeping_keywords)
-                    has_safety = any(keyword in description_lower for keyword in safety_keywords)
-                    return has_housekeeping and not has_safety
-                except Exception: return False
+            # Housekeeping keyword present and no safety keyword, evaluated once per column
+            description_lower = df['Description'].where(df['Description'].notna(), '').astype(str).str.lower()
+            is_housekeeping = (
+                description_lower.str.contains(HOUSEKEEPING_RE, na=False)
+                & ~description_lower.str.contains(HOUSEKEEPING_SAFETY_RE, na=False)
+            )
+
+            # Parse both date columns once; every filter below reuses them
+            created = pd.to_datetime(df['Created Date (WET)'])
+            expected = pd.to_datetime(df['Expected Close Date (WET)'], errors='coerce')
 
             # Filter data
             if report_type == "Closed":
-                filtered_df = df[
+                mask = (
                     (df['Discipline'] == 'HSE') & (df['Status'] == 'Closed') & (df['Days'].notna()) & (df['Days'] > 7) &
-                    (df['Description'].notna()) & (df['Description'].apply(is_housekeeping_record))
-                ].copy()
+                    (df['Description'].notna()) & is_housekeeping
+                )
                 if closed_start and closed_end:
-                    filtered_df = filtered_df[
-                        (pd.to_datetime(filtered_df['Created Date (WET)']) >= closed_start) &
-                        (pd.to_datetime(filtered_df['Expected Close Date (WET)']) <= closed_end)
-                    ].copy()
+                    mask &= (created >= closed_start) & (expected <= closed_end)
+                filtered_df = df[mask].copy()
             else:  # Open
-                filtered_df = df[
-                    (df['Discipline'] == 'HSE') & (df['Status'] == 'Open') & (pd.to_datetime(df['Created Date (WET)']).notna()) &
-                    (df['Description'].notna()) & (df['Description'].apply(is_housekeeping_record))
-                ].copy()
-                if not filtered_df.empty:
-                    filtered_df.loc[:, 'Days_From_Today'] = (today - pd.to_datetime(filtered_df['Created Date (WET)'])).dt.days
-                    filtered_df = filtered_df[filtered_df['Days_From_Today'] > 7].copy()
-                if open_until and not filtered_df.empty:
-                    filtered_df = filtered_df[
-                        (pd.to_datetime(filtered_df['Created Date (WET)']) <= open_until)
-                    ].copy()
+                days_from_today = (today - created).dt.days
+                mask = (
+                    (df['Discipline'] == 'HSE') & (df['Status'] == 'Open') & (created.notna()) &
+                    (df['Description'].notna()) & is_housekeeping & (days_from_today > 7)
+                )
+                if open_until:
+                    mask &= created <= open_until
+                filtered_df = df[mask].copy()
+                filtered_df['Days_From_Today'] = days_from_today[mask].astype('int64')
 
             if filtered_df.empty:
                 return {"Housekeeping": {"Sites": {}, "Grand_Total": 0}}, ""
 
-            # *** FIX: Convert date columns to string before processing ***
-            filtered_df.loc[:, 'Created Date (WET)'] = pd.to_datetime(filtered_df['Created Date (WET)']).dt.strftime('%Y-%m-%d')
-            filtered_df.loc[:, 'Expected Close Date (WET)'] = pd.to_datetime(filtered_df['Expected Close Date (WET)'], errors='coerce').dt.strftime('%Y-%m-%d')
+            # Replace (not .loc-assign) the date columns so they hold strings rather than being cast back to datetimes;
+            # strftime turns a missing date into NaN, so fill in the 'NaT' string the NCR report emits
+            filtered_df['Created Date (WET)'] = created[mask].dt.strftime('%Y-%m-%d').fillna('NaT')
+            filtered_df['Expected Close Date (WET)'] = expected[mask].dt.strftime('%Y-%m-%d').fillna('NaT')
 
-            processed_data = filtered_df.to_dict(orient="records")
-            st.write(f"Data prepared for {report_type} report generation:", processed_data)
+            st.write(f"Data prepared for {report_type} report generation:", filtered_df)
 
             # --- Simplified Local Processing Logic ---
             result = {"Housekeeping": {"Sites": {}, "Grand_Total": 0}}
-            def normalize_site_name(description):
-                desc_lower = description.lower() if isinstance(description, str) else ""
-                tower_match = re.search(r"(?:tower|t)\s*-?\s*(\d+)", desc_lower, re.IGNORECASE)
-                if tower_match: return f"Eden-Tower {tower_match.group(1).zfill(2)}"
-                return "Common_Area"
-
-            for record in processed_data:
-                description = str(record.get("Description", "")).strip()
-                if not description: continue
-                site = normalize_site_name(description)
-                if site not in result["Housekeeping"]["Sites"]:
-                    result["Housekeeping"]["Sites"][site] = {"Count": 0, "Descriptions": [], "Created Date (WET)": [], "Expected Close Date (WET)": [], "Status": []}
-                result["Housekeeping"]["Sites"][site]["Descriptions"].append(description)
-                result["Housekeeping"]["Sites"][site]["Created Date (WET)"].append(record.get("Created Date (WET)", ""))
-                result["Housekeeping"]["Sites"][site]["Expected Close Date (WET)"].append(record.get("Expected Close Date (WET)", ""))
-                result["Housekeeping"]["Sites"][site]["Status"].append(record.get("Status", ""))
-                result["Housekeeping"]["Sites"][site]["Count"] += 1
-                result["Housekeeping"]["Grand_Total"] += 1
+
+            # Site from the tower number in the description (one str.extract pass); no number means Common_Area
+            descriptions = filtered_df['Description'].astype(str).str.strip()
+            keep = descriptions != ""
+            tower_numbers = descriptions[keep].str.extract(TOWER_RE, expand=False)
+            records = pd.DataFrame({
+                "Site": ("Eden-Tower " + tower_numbers.str.zfill(2)).fillna("Common_Area"),
+                "Description": descriptions[keep],
+                "Created Date (WET)": filtered_df.loc[keep, 'Created Date (WET)'],
+                "Expected Close Date (WET)": filtered_df.loc[keep, 'Expected Close Date (WET)'],
+                "Status": filtered_df.loc[keep, 'Status'].astype(object),
+            })
+
+            sites = result["Housekeeping"]["Sites"]
+            grouped = records.groupby("Site", sort=False)
+            counts = grouped.size()
+            for site, lists in grouped.agg(list).to_dict(orient="index").items():
+                sites[site] = {
+                    "Count": int(counts[site]),
+                    "Descriptions": lists["Description"],
+                    "Created Date (WET)": lists["Created Date (WET)"],
+                    "Expected Close Date (WET)": lists["Expected Close Date (WET)"],
+                    "Status": lists["Status"],
+                }
+            result["Housekeeping"]["Grand_Total"] = int(counts.sum())
 
             logger.info(f"Successfully processed {result['Housekeeping']['Grand_Total']} records locally for {report_type} Housekeeping Report.")
             return result, json.dumps(result)
@@ -806,113 +1092,26 @@ def generate_ncr_Housekeeping_report_for_eden(df, report_type, start_date=None,
             return {"error": f"Unexpected Error: {str(e)}"}, ""
 
 
-def clean_and_parse_json(generated_text):
-    """Enhanced JSON parsing with better error handling."""
-    try:
-        # Remove code block markers if present
-        cleaned_text = re.sub(r'```python|```', '', generated_text)
-        
-        # First attempt: Try to parse the text directly as JSON
-        try:
-            for line in cleaned_text.split('\n'):
-                line = line.strip()
-                if line.startswith('{') and line.endswith('}'):
-                    return json.loads(line)
-            return json.loads(cleaned_text)
-        except json.JSONDecodeError as e:
-            logger.warning(f"Initial JSONDecodeError: {str(e)} - Cleaned response: {cleaned_text}")
-        
-        # Second attempt: If the response contains Python code with a print(json.dumps(...)),
-        # extract the JSON from the output
-        json_match = re.search(r'print\s*$$\s*json\.dumps$$(.*?),\s*indent=2\s*$$\s*$$', cleaned_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1).strip()
-            try:
-                return eval(json_str)  # Safely evaluate the JSON string as a Python dict
-            except Exception as e:
-                logger.error(f"Failed to evaluate extracted JSON: {str(e)} - Extracted JSON: {json_str}")
-        
-        logger.error(f"JSONDecodeError: Unable to parse response - Cleaned response: {cleaned_text}")
-        return None
-
-    except Exception as e:
-        logger.error(f"Error in clean_and_parse_json: {str(e)} - Generated text: {generated_text}")
-        return None
-
-
-@st.cache_data
 def generate_ncr_Safety_report_for_eden(df, report_type, start_date=None, end_date=None, until_date=None, debug_bypass_api=False):
     """Generate Safety NCR report for Open or Closed records."""
+    # Today's date is part of the cache key, so the Open report's 7-day cut-off moves with the calendar
+    return _generate_ncr_Safety_report(df, report_type, start_date, end_date, until_date, debug_bypass_api, datetime.today().strftime('%Y/%m/%d'))
+
+@st.cache_data
+def _generate_ncr_Safety_report(df, report_type, start_date, end_date, until_date, debug_bypass_api, today):
     with st.spinner(f"Generating {report_type} Safety NCR Report with WatsonX..."):
         try:
-            today = pd.to_datetime(datetime.today().strftime('%Y/%m/%d'))
+            today = pd.to_datetime(today)
             closed_start = pd.to_datetime(start_date) if start_date else None
             closed_end = pd.to_datetime(end_date) if end_date else None
             open_until = pd.to_datetime(until_date) if until_date else today
 
-            # Define safety keywords
-            safety_keywords = [
-                # --- Personal Protective Equipment (PPE) ---
-                'ppe', 'helmet', 'safety shoes', 'safety belt', 'harness', 'without ppe',
-                'no helmet', 'no shoes', 'no safety belt',
-                # --- Working at Height ---
-                'fall protection', 'lifeline', 'guard rail', 'unprotected edge',
-                'working at height', 'fall catch net', 'catch net', 'scaffold', 'ladder',
-                # --- Barricading & Access ---
-                'barricade', 'barricading', 'no barrier', 'unauthorized operation', 'gate',
-                # --- Electrical ---
-                'electrical hazard', 'exposed wire', 'electric shock', 'temporary electricity',
-                'halogen lamp',
-                # --- Excavation & Soil ---
-                'excavation', 'collapse of soil', 'down slope movement',
-                # --- Equipment & Lifting ---
-                'crane', 'lifting', 'rigging', 'tpi', 'third party inspection', 'tpic',
-                'crane operator', 'cabin glass',
-                # --- Fire & Hazardous Materials ---
-                'fire extinguisher', 'fire hazard', 'firecase', 'spill', 'leak',
-                'hazardous material', 'environmental contamination', 'debris chute', 'dust suppression',
-                # --- General Safety Violations ---
-                'unsafe act', 'unsafe condition', 'violation of hse', 'hse norms',
-                'safety norms', 'safety precaution', 'unsafe platform', 'negligence in supervision',
-                'health and safety plan',
-                # --- Keywords from user examples ---
-                'labour is working at height', 'tank','NAT'
-            ]
+            # Lower-case once; the keyword filter and the site lookup both reuse it
+            description_lower = df['Description'].astype(object).str.lower()
 
-            def is_safety_record(description):
-                if description is None or not isinstance(description, str):
-                    logger.debug(f"Invalid description encountered: {description}")
-                    return False
-                description_lower = description.lower()
-                matches = any(keyword in description_lower for keyword in safety_keywords)
-                if not matches:
-                    logger.debug(f"No safety keywords found in: {description}")
-                return matches
-
-            # Normalize site names to support combined tower Common Areas
-            def normalize_site_name(description):
-                desc_lower = description.lower() if isinstance(description, str) else ""
-                # Handle tower-specific CommonArea (e.g., Eden-Tower-04-CommonArea or Eden-Tower-04-05-CommonArea)
-                tower_common_match = re.search(r'(?:eden-)?tower-(\d+)(?:-(\d+))?-commonarea', desc_lower, re.IGNORECASE)
-                if tower_common_match:
-                    tower_num1 = tower_common_match.group(1).zfill(2)
-                    tower_num2 = tower_common_match.group(2).zfill(2) if tower_common_match.group(2) else None
-                    if tower_num2:
-                        return (f"Eden-Tower {tower_num1}", f"Eden-Tower {tower_num2}")
-                    else:
-                        return f"Eden-Tower {tower_num1}"
-                
-                # Handle general CommonArea variations
-                if "commonarea" in desc_lower or "common area" in desc_lower:
-                    return "Common_Area"
-                
-                # Handle regular tower names
-                tower_match = re.search(r"(?:eden-)?(?:tower|t)\s*-?\s*(\d+|2021|28)", desc_lower, re.IGNORECASE)
-                if tower_match:
-                    num = tower_match.group(1).zfill(2)
-                    return f"Eden-Tower {num}"
-                
-                return "Common_Area"
+            # Parse both date columns once; every filter below reuses them
+            created = pd.to_datetime(df['Created Date (WET)'])
+            expected = pd.to_datetime(df['Expected Close Date (WET)'], errors='coerce')
 
             # Filter data
             if report_type == "Closed":
@@ -920,24 +1119,23 @@ def generate_ncr_Safety_report_for_eden(df, report_type, start_date=None, end_da
                 st.write(df[['Days', 'Description', 'Created Date (WET)', 'Expected Close Date (WET)']].isnull().sum())
 
                 # --- Corrected Code ---
-                filtered_df = df[
+                mask = (
                     (
                         (df['Discipline'] == 'HSE') &  # <-- Changed to AND
-                        (df['Description'].apply(is_safety_record))
+                        _safety_keyword_mask(description_lower)
                     ) &
                     (df['Status'] == 'Open') &
-                    (pd.to_datetime(df['Created Date (WET)']).notna())
-                ].copy()
+                    (created.notna())
+                )
                 
                 # Apply date filtering only if dates are provided
                 if closed_start and closed_end:
-                    filtered_df = filtered_df[
-                        (filtered_df['Created Date (WET)'] >= closed_start) &
-                        (pd.to_datetime(filtered_df['Expected Close Date (WET)'], errors='coerce') <= closed_end)
-                    ].copy()
+                    mask &= (created >= closed_start) & (expected <= closed_end)
+                    filtered_df = df[mask].copy()
                     st.write(f"Records after date filtering ({closed_start} to {closed_end}):")
                     st.write(filtered_df)
                 else:
+                    filtered_df = df[mask].copy()
                     st.warning("No date range provided for Closed report, including all records.")
 
                 st.write(f"Filtered Closed DataFrame ({len(filtered_df)} records):")
@@ -951,338 +1149,226 @@ def generate_ncr_Safety_report_for_eden(df, report_type, start_date=None, end_da
             else:  # Open
                 st.write(report_type)
                 
-                # Initial filtering for open records
-                filtered_df = df[
+                days_from_today = (today - created).dt.days
+                mask = (
                     (
                         (df['Discipline'] == 'HSE') |
-                        (df['Description'].apply(is_safety_record))
+                        _safety_keyword_mask(description_lower)
                     ) &
                     (df['Status'] == 'Open') &
-                    (pd.to_datetime(df['Created Date (WET)']).notna())
-                ].copy()
-                filtered_df.loc[:, 'Days_From_Today'] = (today - pd.to_datetime(filtered_df['Created Date (WET)'])).dt.days
-                filtered_df = filtered_df[filtered_df['Days_From_Today'] > 7].copy()
+                    (created.notna()) &
+                    (days_from_today > 7)
+                )
                 if open_until:
-                    filtered_df = filtered_df[
-                        (pd.to_datetime(filtered_df['Created Date (WET)']) <= open_until)
-                    ].copy()
+                    mask &= created <= open_until
+                filtered_df = df[mask].copy()
+                filtered_df['Days_From_Today'] = days_from_today[mask].astype('int64')
 
             if filtered_df.empty:
                 return {"Safety": {"Sites": {}, "Grand_Total": 0}}, ""
 
-            filtered_df.loc[:, 'Created Date (WET)'] = pd.to_datetime(filtered_df['Created Date (WET)']).dt.strftime('%Y-%m-%d')
-            filtered_df.loc[:, 'Expected Close Date (WET)'] = pd.to_datetime(filtered_df['Expected Close Date (WET)']).dt.strftime('%Y-%m-%d')
-
-            processed_data = filtered_df.to_dict(orient="records")
-    
-            cleaned_data = []
-            seen_descriptions = set()
-            # Define standard_sites before use
-            standard_sites = [
-                "Eden-Tower 04", "Eden-Tower 05", "Eden-Tower 06", "Eden-Tower 07", "Common_Area"
-            ]
-            for record in processed_data:
-                description = str(record.get("Description", "")).strip()
-                if description and description not in seen_descriptions:
-                    seen_descriptions.add(description)
-                    cleaned_record = {
-                        "Description": description,
-                        "Created Date (WET)": str(record.get("Created Date (WET)", "")),
-                        "Expected Close Date (WET)": str(record.get("Expected Close Date (WET)", "")),
-                        "Status": str(record.get("Status", "")),
-                        "Days": record.get("Days", 0),
-                        "Discipline": "HSE"
-                    }
-                    if report_type == "Open":
-                        cleaned_record["Days_From_Today"] = record.get("Days_From_Today", 0)
-                    # Assign tower(s) based on description using normalize_site_name
-                    normalized_towers = normalize_site_name(description)
-                    if isinstance(normalized_towers, tuple):
-                        # Create a record for each tower in the combined CommonArea
-                        for tower in normalized_towers:
-                            tower_record = cleaned_record.copy()
-                            tower_record["Tower"] = tower
-                            cleaned_data.append(tower_record)
-                            logger.debug(f"Tower set to {tower}")
-                    else:
-                        cleaned_record["Tower"] = normalized_towers
-                        cleaned_data.append(cleaned_record)
-                        logger.debug(f"Tower set to {normalized_towers}")
-
-            st.write(f"Total {report_type} records to process: {len(cleaned_data)}")
-
-            if not cleaned_data:
+            # Replace (not .loc-assign) the date columns so they hold strings rather than being cast back to datetimes;
+            # strftime turns a missing date into NaN, so fill in the 'NaT' string the NCR report emits
+            filtered_df['Created Date (WET)'] = created[mask].dt.strftime('%Y-%m-%d').fillna('NaT')
+            filtered_df['Expected Close Date (WET)'] = expected[mask].dt.strftime('%Y-%m-%d').fillna('NaT')
+
+            # Keep the first record per non-empty description
+            descriptions = filtered_df['Description'].astype(object).astype(str).str.strip()
+            unique_df = filtered_df.assign(Description=descriptions)[descriptions != ""].drop_duplicates(subset="Description", keep="first")
+
+            cleaned_df = pd.DataFrame({
+                "Description": unique_df['Description'],
+                "Created Date (WET)": unique_df['Created Date (WET)'].astype(object).astype(str),
+                "Expected Close Date (WET)": unique_df['Expected Close Date (WET)'].astype(object).astype(str),
+                "Status": unique_df['Status'].astype(object).astype(str),
+                "Days": unique_df['Days'],
+                "Discipline": "HSE"
+            })
+            if report_type == "Open":
+                cleaned_df["Days_From_Today"] = unique_df['Days_From_Today']
+            # Records the local count keeps, decided once from the already lower-cased descriptions;
+            # the bypass merges all of them and a failed chunk merges its own slice.
+            # cleaned_df's Discipline is the constant "HSE", so only the keyword and Days tests can reject a row.
+            unique_lower = description_lower.loc[unique_df.index].str.strip()
+            local_match = _safety_keyword_mask(unique_lower) & (cleaned_df["Days"] > 7)
+            # A combined CommonArea maps to a list of towers; explode gives each tower its own record
+            cleaned_df["Tower"] = _safety_sites(unique_lower)
+            cleaned_df = cleaned_df.explode("Tower")
+            local_match = local_match.loc[cleaned_df.index].to_numpy()
+
+            st.write(f"Total {report_type} records to process: {len(cleaned_df)}")
+
+            if cleaned_df.empty:
                 logger.info("No safety records after deduplication")
                 return {"Safety": {"Sites": {}, "Grand_Total": 0}}, ""
 
-            result = {"Safety": {"Sites": {}, "Grand_Total": 0}}
+            # Buckets appear on first use; their fields are insertion-ordered dicts, so repeats are dropped as
+            # each chunk is merged and every field is turned into a list once, just before returning
+            sites = defaultdict(_empty_site)
+            result = {"Safety": {"Sites": sites, "Grand_Total": 0}}
+
+            def group_locally(matches):
+                """Per-tower record lists and counts for locally matched records, from one groupby."""
+                grouped = matches[["Tower", "Description", "Created Date (WET)", "Expected Close Date (WET)", "Status"]].groupby("Tower", sort=False)
+                return grouped.agg(list).to_dict(orient="index"), grouped.size()
+
+            def merge_locally(matches):
+                """Count locally matched records per tower without the model (API fallback)."""
+                lists_by_site, counts = group_locally(matches)
+                for site, lists in lists_by_site.items():
+                    bucket = sites[site]
+                    bucket["Descriptions"].update(dict.fromkeys(lists["Description"]))
+                    bucket["Created Date (WET)"].update(dict.fromkeys(lists["Created Date (WET)"]))
+                    bucket["Expected Close Date (WET)"].update(dict.fromkeys(lists["Expected Close Date (WET)"]))
+                    bucket["Status"].update(dict.fromkeys(lists["Status"]))
+                    bucket["Count"] += int(counts[site])
+                result["Safety"]["Grand_Total"] += int(counts.sum())
 
             if debug_bypass_api:
                 logger.info("Bypassing WatsonX API for debugging")
-                for record in cleaned_data:
-                    if is_safety_record(record["Description"]) and (record.get("Days", 0) > 7 or record.get("Days_From_Reference", 0) > 7) and record.get("Discipline") == "HSE":
-                        site = record["Tower"]
-                        if site not in result["Safety"]["Sites"]:
-                            result["Safety"]["Sites"][site] = {
-                                "Count": 0,
-                                "Descriptions": [],
-                                "Created Date (WET)": [],
-                                "Expected Close Date (WET)": [],
-                                "Status": []
-                            }
-                        result["Safety"]["Sites"][site]["Descriptions"].append(record["Description"])
-                        result["Safety"]["Sites"][site]["Created Date (WET)"].append(record["Created Date (WET)"])
-                        result["Safety"]["Sites"][site]["Expected Close Date (WET)"].append(record["Expected Close Date (WET)"])
-                        result["Safety"]["Sites"][site]["Status"].append(record["Status"])
-                        result["Safety"]["Sites"][site]["Count"] += 1
-                        result["Safety"]["Grand_Total"] += 1
-                logger.debug(f"Debug result: {json.dumps(result, indent=2)}")
+                # The bypass reports every matched record as is, without the dedup applied to merged chunks
+                lists_by_site, counts = group_locally(cleaned_df[local_match])
+                result["Safety"]["Sites"] = {
+                    site: {
+                        "Count": int(counts[site]),
+                        "Descriptions": lists["Description"],
+                        "Created Date (WET)": lists["Created Date (WET)"],
+                        "Expected Close Date (WET)": lists["Expected Close Date (WET)"],
+                        "Status": lists["Status"],
+                    }
+                    for site, lists in lists_by_site.items()
+                }
+                result["Safety"]["Grand_Total"] = int(counts.sum())
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Debug result: {json.dumps(result, indent=2)}")
                 return result, json.dumps(result)
 
             access_token = get_access_token(API_KEY)
             if not access_token:
                 return {"error": "Failed to obtain access token"}, ""
 
-            chunk_size = 10
-            total_chunks = (len(cleaned_data) + chunk_size - 1) // chunk_size
-
-            session = requests.Session()
-            retry_strategy = Retry(
-                total=3,
-                backoff_factor=2,
-                status_forcelist=[500, 502, 503, 504, 429, 408],
-                allowed_methods=["POST"],
-                raise_on_redirect=True,
-                raise_on_status=True
-            )
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session.mount("https://", adapter)
+            # Records per WatsonX request; larger batches mean fewer round trips, with the output budget scaled to match
+            chunk_size = int(os.getenv("SAFETY_CHUNK_SIZE", 10))
+            total_chunks = (len(cleaned_df) + chunk_size - 1) // chunk_size
+            max_workers = min(WATSONX_WORKERS, total_chunks)
 
             progress_placeholder = st.empty()
             status_placeholder = st.empty()
             error_placeholder = st.empty()
             progress_bar = progress_placeholder.progress(0)
 
-            for i in range(0, len(cleaned_data), chunk_size):
-                chunk = cleaned_data[i:i + chunk_size]
-                current_chunk = i // chunk_size + 1
-                progress = min((current_chunk / total_chunks) * 100, 100)
-                progress_bar.progress(int(progress))
-                status_placeholder.write(f"Processed {current_chunk}/{total_chunks} chunks ({int(progress)}%)")
-                logger.debug(f"Chunk data: {json.dumps(chunk, indent=2)}")
-
-                prompt = (
-                    "Generate EXACTLY ONE JSON object matching the format below. Do not repeat input data, generate multiple objects, include code, explanations, or code blocks. "
-                    f"Count Safety NCRs by 'Tower' where 'Discipline' is 'HSE' and {'Days' if report_type == 'Closed' else 'Days_From_Reference'} > 7. "
-                    "Descriptions must contain these keywords (case-insensitive): "
-                    "'safety precautions', 'temporary electricity', 'on-site labor is working without wearing safety belt', 'safety norms', 'Missing Cabin Glass – Tower Crane', 'Crane Operator cabin front glass', "
-                    "'site on priority basis lifeline is not fixed at the working place', 'operated only after Third Party Inspection and certification crane operated without TPIC', "
-                    "'safety precautions are not taken seriously at site Tower crane operator cabin front glass is missing while crane operator is working inside cabin', "
-                    "'no barrier around', 'Lock and Key arrangement to restrict unauthorized operations, buzzer while operation, gates at landing platforms, catch net in the vicinity', "
-                    "'safety precautions are not taken seriously', 'firecase', 'Health and Safety Plan', 'noticed that submission of statistics report is regularly delayed', "
-                    "'crane operator cabin front glass is missing while crane operator is working inside cabin','Tower 7, We have found that the labour is working at height without wearing safety belt and safety shoes leading to violation of HSE norms due to negligence in supervision.', 'labor is working without wearing safety belt', 'barricading', 'tank', 'safety shoes', "
-                    "'safety belt', 'helmet', 'lifeline', 'guard rails', 'fall protection', 'PPE','Violations of HSE','electrical hazard', 'unsafe platform', 'catch net', 'edge protection', 'TPI', 'scaffold', "
-                    "'lifting equipment', 'dust suppression', 'debris chute', 'spill control', 'crane operator', 'halogen lamps', 'fall catch net', 'environmental contamination', 'fire hazard','continuous collapse of soil leading to instability','continuous down slope movement of soil'.\n\n"
-                    "Group by 'Tower' (e.g., 'Eden-Tower 06', 'Common_Area'). Include all input sites, even with count 0. Collect 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status' in arrays. Set 'Count' to the number of matching NCRs.\n\n"
-                    "Output Format:\n"
-                    "{\n"
-                    '  "Safety": {\n'
-                    '    "Sites": {\n'
-                    '      "Site_Name": {\n'
-                    '        "Descriptions": [],\n'
-                    '        "Created Date (WET)": [],\n'
-                    '        "Expected Close Date (WET)": [],\n'
-                    '        "Status": [],\n'
-                    '        "Count": 0\n'
-                    '      }\n'
-                    '    },\n'
-                    '    "Grand_Total": 0\n'
-                    '  }\n'
-                    '}\n\n'
-                    f"Input Data: {json.dumps(chunk)}\n"
-                )
+            headers = {
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {access_token}"
+            }
 
-                payload = {
-                    "input": prompt,
-                    "parameters": {
-                        "decoding_method": "greedy",
-                        "max_new_tokens": 300,
-                        "min_new_tokens": 0,
-                        "temperature": 0.001,
-                        "n": 1
-                    },
-                    "model_id": MODEL_ID,
-                    "project_id": PROJECT_ID
-                }
-                headers = {
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {access_token}"
-                }
+            def post_chunk(payload):
+                logger.debug("Initiating WatsonX API call...")
+                return _post_watsonx_cached(_watsonx_safety_http, payload, headers=headers, verify=certifi.where(), timeout=30)
+
+            def fall_back(matches, log_message, user_message):
+                """Report a chunk the model did not answer usably and count its records locally instead."""
+                logger.error(log_message)
+                error_placeholder.error(user_message)
+                merge_locally(matches)
+
+            # Chunks are independent, so their WatsonX calls overlap; responses are merged in chunk order.
+            # Chunks are sliced off the frame lazily and submitted as soon as each prompt is built.
+            prompt_prefix = SAFETY_PROMPT_PREFIXES["Closed" if report_type == "Closed" else "Open"]
+            fallback_rows = []
+            futures = []
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for start in range(0, len(cleaned_df), chunk_size):
+                    rows = cleaned_df.iloc[start:start + chunk_size]
+                    chunk_json = json.dumps(rows.to_dict(orient="records"))
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Chunk data: {chunk_json}")
+
+                    prompt = prompt_prefix + chunk_json + "\n"
+
+                    payload = {
+                        "input": prompt,
+                        "parameters": {
+                            "decoding_method": "greedy",
+                            "max_new_tokens": 30 * chunk_size,
+                            "min_new_tokens": 0,
+                            "temperature": 0.001,
+                            "n": 1,
+                            "stop_sequences": WATSONX_STOP_SEQUENCES
+                        },
+                        "model_id": MODEL_ID,
+                        "project_id": PROJECT_ID
+                    }
+                    fallback_rows.append(rows[local_match[start:start + chunk_size]])
+                    futures.append(executor.submit(post_chunk, payload))
 
-                try:
-                    logger.debug("Initiating WatsonX API call...")
-                    response = session.post(WATSONX_API_URL, headers=headers, json=payload, verify=certifi.where(), timeout=30)
-                    logger.info(f"WatsonX API response status: {response.status_code}")
-
-                    if response.status_code == 200:
-                        api_result = response.json()
-                        generated_text = api_result.get("results", [{}])[0].get("generated_text", "").strip()
-                        logger.debug(f"Generated text for chunk {current_chunk}: {generated_text}")
-
-                        json_str = None
-                        brace_count = 0
-                        start_idx = None
-                        for idx, char in enumerate(generated_text):
-                            if char == '{':
-                                if brace_count == 0:
-                                    start_idx = idx
-                                brace_count += 1
-                            elif char == '}':
-                                brace_count -= 1
-                                if brace_count == 0 and start_idx is not None:
-                                    json_str = generated_text[start_idx:idx + 1]
-                                    break
-
-                        if json_str:
-                            try:
-                                logger.debug(f"Extracted JSON string: {json_str}")
-                                parsed_json = json.loads(json_str)
-                                chunk_result = parsed_json.get("Safety", {})
-                                chunk_sites = chunk_result.get("Sites", {})
-                                chunk_grand_total = chunk_result.get("Grand_Total", 0)
-
-                                for site, values in chunk_sites.items():
-                                    if not isinstance(values, dict):
-                                        logger.warning(f"Invalid site data for {site}: {values}")
-                                        continue
-                                    if site not in result["Safety"]["Sites"]:
-                                        result["Safety"]["Sites"][site] = {
-                                            "Count": 0,
-                                            "Descriptions": [],
-                                            "Created Date (WET)": [],
-                                            "Expected Close Date (WET)": [],
-                                            "Status": []
-                                        }
-                                    result["Safety"]["Sites"][site]["Descriptions"].extend(values.get("Descriptions", []))
-                                    result["Safety"]["Sites"][site]["Created Date (WET)"].extend(values.get("Created Date (WET)", []))
-                                    result["Safety"]["Sites"][site]["Expected Close Date (WET)"].extend(values.get("Expected Close Date (WET)", []))
-                                    result["Safety"]["Sites"][site]["Status"].extend(values.get("Status", []))
-                                    result["Safety"]["Sites"][site]["Count"] += values.get("Count", 0)
-                                result["Safety"]["Grand_Total"] += chunk_grand_total
-                                logger.debug(f"Successfully processed chunk {current_chunk}/{total_chunks}")
-                            except json.JSONDecodeError as e:
-                                logger.error(f"JSONDecodeError for chunk {current_chunk}: {str(e)}")
-                                error_placeholder.error(f"Failed to parse JSON for chunk {current_chunk}: {str(e)}")
-                                for record in chunk:
-                                    if is_safety_record(record["Description"]) and (record.get("Days", 0) > 7 or record.get("Days_From_Reference", 0) > 7) and record.get("Discipline") == "HSE":
-                                        site = record["Tower"]
-                                        if site not in result["Safety"]["Sites"]:
-                                            result["Safety"]["Sites"][site] = {
-                                                "Count": 0,
-                                                "Descriptions": [],
-                                                "Created Date (WET)": [],
-                                                "Expected Close Date (WET)": [],
-                                                "Status": []
-                                            }
-                                        result["Safety"]["Sites"][site]["Descriptions"].append(record["Description"])
-                                        result["Safety"]["Sites"][site]["Created Date (WET)"].append(record["Created Date (WET)"])
-                                        result["Safety"]["Sites"][site]["Expected Close Date (WET)"].append(record["Expected Close Date (WET)"])
-                                        result["Safety"]["Sites"][site]["Status"].append(record["Status"])
-                                        result["Safety"]["Sites"][site]["Count"] += 1
-                                        result["Safety"]["Grand_Total"] += 1
+                for current_chunk, (chunk_matches, future) in enumerate(zip(fallback_rows, futures), start=1):
+                    try:
+                        cache_key, generated_text, response = future.result()
+                        if response is not None:
+                            logger.info(f"WatsonX API response status: {response.status_code}")
+
+                        if generated_text is not None:
+                            logger.debug(f"Generated text for chunk {current_chunk}: {generated_text}")
+
+                            # raw_decode parses the object starting at the first brace and ignores any trailing text
+                            start_idx = generated_text.find('{')
+
+                            if start_idx != -1:
+                                try:
+                                    parsed_json, end_idx = JSON_DECODER.raw_decode(generated_text, start_idx)
+                                    logger.debug("Extracted JSON string: %s", generated_text[start_idx:end_idx])
+                                    chunk_result = parsed_json.get("Safety", {})
+                                    chunk_sites = chunk_result.get("Sites", {})
+                                    chunk_grand_total = chunk_result.get("Grand_Total", 0)
+
+                                    for site, values in chunk_sites.items():
+                                        if not isinstance(values, dict):
+                                            logger.warning(f"Invalid site data for {site}: {values}")
+                                            continue
+                                        bucket = sites[site]
+                                        bucket["Descriptions"].update(dict.fromkeys(values.get("Descriptions", [])))
+                                        bucket["Created Date (WET)"].update(dict.fromkeys(values.get("Created Date (WET)", [])))
+                                        bucket["Expected Close Date (WET)"].update(dict.fromkeys(values.get("Expected Close Date (WET)", [])))
+                                        bucket["Status"].update(dict.fromkeys(values.get("Status", [])))
+                                        bucket["Count"] += values.get("Count", 0)
+                                    result["Safety"]["Grand_Total"] += chunk_grand_total
+                                    _remember_watsonx_text(cache_key, generated_text)
+                                    logger.debug(f"Successfully processed chunk {current_chunk}/{total_chunks}")
+                                except json.JSONDecodeError as e:
+                                    fall_back(chunk_matches, f"JSONDecodeError for chunk {current_chunk}: {str(e)}", f"Failed to parse JSON for chunk {current_chunk}: {str(e)}")
+                            else:
+                                fall_back(chunk_matches, f"No valid JSON for chunk {current_chunk}: {generated_text}", f"No valid JSON for chunk {current_chunk}")
                         else:
-                            logger.error(f"No valid JSON for chunk {current_chunk}: {generated_text}")
-                            error_placeholder.error(f"No valid JSON for chunk {current_chunk}")
-                            for record in chunk:
-                                if is_safety_record(record["Description"]) and (record.get("Days", 0) > 7 or record.get("Days_From_Reference", 0) > 7) and record.get("Discipline") == "HSE":
-                                    site = record["Tower"]
-                                    if site not in result["Safety"]["Sites"]:
-                                        result["Safety"]["Sites"][site] = {
-                                            "Count": 0,
-                                            "Descriptions": [],
-                                            "Created Date (WET)": [],
-                                            "Expected Close Date (WET)": [],
-                                            "Status": []
-                                        }
-                                    result["Safety"]["Sites"][site]["Descriptions"].append(record["Description"])
-                                    result["Safety"]["Sites"][site]["Created Date (WET)"].append(record["Created Date (WET)"])
-                                    result["Safety"]["Sites"][site]["Expected Close Date (WET)"].append(record["Expected Close Date (WET)"])
-                                    result["Safety"]["Sites"][site]["Status"].append(record["Status"])
-                                    result["Safety"]["Sites"][site]["Count"] += 1
-                                    result["Safety"]["Grand_Total"] += 1
-                    else:
-                        logger.error(f"WatsonX API error for chunk {current_chunk}: {response.status_code} - {response.text}")
-                        error_placeholder.error(f"WatsonX API error for chunk {current_chunk}: {response.status_code}")
-                        for record in chunk:
-                            if is_safety_record(record["Description"]) and (record.get("Days", 0) > 7 or record.get("Days_From_Reference", 0) > 7) and record.get("Discipline") == "HSE":
-                                site = record["Tower"]
-                                if site not in result["Safety"]["Sites"]:
-                                    result["Safety"]["Sites"][site] = {
-                                        "Count": 0,
-                                        "Descriptions": [],
-                                        "Created Date (WET)": [],
-                                        "Expected Close Date (WET)": [],
-                                        "Status": []
-                                    }
-                                result["Safety"]["Sites"][site]["Descriptions"].append(record["Description"])
-                                result["Safety"]["Sites"][site]["Created Date (WET)"].append(record["Created Date (WET)"])
-                                result["Safety"]["Sites"][site]["Expected Close Date (WET)"].append(record["Expected Close Date (WET)"])
-                                result["Safety"]["Sites"][site]["Status"].append(record["Status"])
-                                result["Safety"]["Sites"][site]["Count"] += 1
-                                result["Safety"]["Grand_Total"] += 1
-                except requests.exceptions.ReadTimeout as e:
-                    logger.error(f"ReadTimeoutError for chunk {current_chunk}: {str(e)}")
-                    error_placeholder.error(f"Failed to connect to WatsonX API for chunk {current_chunk}: {str(e)}")
-                    for record in chunk:
-                        if is_safety_record(record["Description"]) and (record.get("Days", 0) > 7 or record.get("Days_From_Reference", 0) > 7) and record.get("Discipline") == "HSE":
-                            site = record["Tower"]
-                            if site not in result["Safety"]["Sites"]:
-                                result["Safety"]["Sites"][site] = {
-                                    "Count": 0,
-                                    "Descriptions": [],
-                                    "Created Date (WET)": [],
-                                    "Expected Close Date (WET)": [],
-                                    "Status": []
-                                }
-                            result["Safety"]["Sites"][site]["Descriptions"].append(record["Description"])
-                            result["Safety"]["Sites"][site]["Created Date (WET)"].append(record["Created Date (WET)"])
-                            result["Safety"]["Sites"][site]["Expected Close Date (WET)"].append(record["Expected Close Date (WET)"])
-                            result["Safety"]["Sites"][site]["Status"].append(record["Status"])
-                            result["Safety"]["Sites"][site]["Count"] += 1
-                            result["Safety"]["Grand_Total"] += 1
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"RequestException for chunk {current_chunk}: {str(e)}")
-                    error_placeholder.error(f"Failed to connect to WatsonX API for chunk {current_chunk}: {str(e)}")
-                    for record in chunk:
-                        if is_safety_record(record["Description"]) and (record.get("Days", 0) > 7 or record.get("Days_From_Reference", 0) > 7) and record.get("Discipline") == "HSE":
-                            site = record["Tower"]
-                            if site not in result["Safety"]["Sites"]:
-                                result["Safety"]["Sites"][site] = {
-                                    "Count": 0,
-                                    "Descriptions": [],
-                                    "Created Date (WET)": [],
-                                    "Expected Close Date (WET)": [],
-                                    "Status": []
-                                }
-                            result["Safety"]["Sites"][site]["Descriptions"].append(record["Description"])
-                            result["Safety"]["Sites"][site]["Created Date (WET)"].append(record["Created Date (WET)"])
-                            result["Safety"]["Sites"][site]["Expected Close Date (WET)"].append(record["Expected Close Date (WET)"])
-                            result["Safety"]["Sites"][site]["Status"].append(record["Status"])
-                            result["Safety"]["Sites"][site]["Count"] += 1
-                            result["Safety"]["Grand_Total"] += 1
+                            fall_back(chunk_matches, f"WatsonX API error for chunk {current_chunk}: {response.status_code} - {response.text}", f"WatsonX API error for chunk {current_chunk}: {response.status_code}")
+                    except requests.exceptions.ReadTimeout as e:
+                        fall_back(chunk_matches, f"ReadTimeoutError for chunk {current_chunk}: {str(e)}", f"Failed to connect to WatsonX API for chunk {current_chunk}: {str(e)}")
+                    except requests.exceptions.RequestException as e:
+                        fall_back(chunk_matches, f"RequestException for chunk {current_chunk}: {str(e)}", f"Failed to connect to WatsonX API for chunk {current_chunk}: {str(e)}")
+                    except ValueError as e:
+                        # A 200 whose body is not JSON (e.g. a proxy error page) only costs this chunk its model answer
+                        fall_back(chunk_matches, f"Invalid WatsonX response body for chunk {current_chunk}: {str(e)}", f"Invalid WatsonX response for chunk {current_chunk}: {str(e)}")
+
+                    # Tick once the chunk's response has arrived and been merged
+                    progress = min((current_chunk / total_chunks) * 100, 100)
+                    progress_bar.progress(int(progress))
+                    status_placeholder.write(f"Processed {current_chunk}/{total_chunks} chunks ({int(progress)}%)")
 
             progress_bar.progress(100)
             status_placeholder.write(f"Processed {total_chunks}/{total_chunks} chunks (100%)")
-            logger.debug(f"Final result before deduplication: {json.dumps(result, indent=2)}")
-
-            for site in result["Safety"]["Sites"]:
-                result["Safety"]["Sites"][site]["Descriptions"] = list(set(result["Safety"]["Sites"][site]["Descriptions"]))
-                result["Safety"]["Sites"][site]["Created Date (WET)"] = list(set(result["Safety"]["Sites"][site]["Created Date (WET)"]))
-                result["Safety"]["Sites"][site]["Expected Close Date (WET)"] = list(set(result["Safety"]["Sites"][site]["Expected Close Date (WET)"]))
-                result["Safety"]["Sites"][site]["Status"] = list(set(result["Safety"]["Sites"][site]["Status"]))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Final result before deduplication: {json.dumps(result, indent=2)}")
+
+            # The ordered-dict fields kept first-seen order, unlike set(), so output is stable across runs.
+            # Only the lists are deduplicated: Count and Grand_Total stay the raw number of records merged.
+            for bucket in sites.values():
+                for field in ("Descriptions", "Created Date (WET)", "Expected Close Date (WET)", "Status"):
+                    bucket[field] = list(bucket[field])
+            result["Safety"]["Sites"] = dict(sites)
             
-            logger.debug(f"Final result after deduplication: {json.dumps(result, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Final result after deduplication: {json.dumps(result, indent=2)}")
             return result, json.dumps(result)
         except Exception as e:
             logger.error(f"Unexpected error in generate_ncr_Safety_report: {str(e)}")
@@ -1290,146 +1376,298 @@ def generate_ncr_Safety_report_for_eden(df, report_type, start_date=None, end_da
             return {"error": f"Unexpected Error: {str(e)}"}, ""
  
 
-@st.cache_data
-def generate_consolidated_ncr_Housekeeping_excel_for_eden(combined_result, report_title="Housekeeping: Current Month"):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
-        
-        title_format = workbook.add_format({
+@lru_cache(maxsize=1)
+def _report_date_parts(today):
+    """Day, month name and year strings for report titles and sheet names; formatted once per calendar day."""
+    return today.strftime("%d"), today.strftime("%B"), today.strftime("%Y")
+
+
+@lru_cache(maxsize=None)
+def _pour_level(pour_str):
+    """Standard pour level for a stripped, lower-cased pour label; the label set is small, so results are cached."""
+    # Handle Module X format
+    if pour_str.startswith("module "):
+        try:
+            module_num = int(pour_str.split(" ")[1])
+            if 1 <= module_num <= 2:  # Assuming 2 pour levels
+                return f"Pour {module_num}"
+        except (IndexError, ValueError):
+            pass
+
+    # Handle Pour X format
+    elif pour_str.startswith("pour "):
+        try:
+            pour_num = int(pour_str.split(" ")[1])
+            if 1 <= pour_num <= 2:  # Assuming 2 pour levels
+                return f"Pour {pour_num}"
+        except (IndexError, ValueError):
+            pass
+
+    # Handle direct numbers
+    elif pour_str.isdigit():
+        pour_num = int(pour_str)
+        if 1 <= pour_num <= 2:
+            return f"Pour {pour_num}"
+
+    # Unrecognized formats and the common variations ("general", "misc", ...) all count as common
+    return "common"
+
+
+def _map_pour_to_level(pour_name):
+    """Map various pour name formats to standardized pour levels"""
+    if not pour_name:
+        return "common"
+    return _pour_level(str(pour_name).strip().lower())
+
+
+def _tally_pours(site_data, pour_counts, common_counts, default_category):
+    """Count an NCR site's records once per pour they list; pours that are not a pour_counts level go to common_counts."""
+    pours = site_data.get("Pours", ())
+    # Tally (level, category) pairs in one pass, then fold the few distinct pairs into the tables
+    tally = Counter(
+        (_map_pour_to_level(pour), DISCIPLINE_TO_CATEGORY.get(discipline, default_category))
+        for i, discipline in enumerate(site_data.get("Discipline", ()))
+        for pour in (pours[i] if i < len(pours) else ['Common'])
+    )
+    for (pour_level, cat), count in tally.items():
+        if pour_level in pour_counts:
+            pour_counts[pour_level][cat] += count
+        else:
+            common_counts[cat] += count
+
+
+def _truncate_sheet_name(base_name, max_length=31):
+    """Excel sheet names are capped at 31 characters; longer names are cut and marked with an ellipsis."""
+    if len(base_name) > max_length:
+        return base_name[:max_length - 3] + "..."
+    return base_name
+
+
+@lru_cache(maxsize=4096)
+def _normalize_tower_site(site):
+    """Map a Housekeeping/Safety site key onto its "Eden-Tower NN" or Common_Area row."""
+    if site == "Common_Area":
+        return site
+    if "CommonArea" in site or "Common Area" in site:
+        return "Common_Area"
+    match = SITE_TOWER_RE.search(site)
+    if match:
+        num = match.group(1).zfill(2)
+        return f"Eden-Tower {num}"
+    return site
+
+
+@lru_cache(maxsize=4096)
+def _normalize_ncr_site(site):
+    """Open/Close NCR row for a site key ("Tower 4", Common_Area), or a pair of towers for a two-tower CommonArea."""
+    # Handle tower-specific CommonArea (e.g., Eden-Tower-04-CommonArea or Eden-Tower-04-05-CommonArea)
+    tower_common_match = TOWER_COMMON_AREA_RE.search(site)
+    if tower_common_match:
+        # If it's a combined tower CommonArea (e.g., Eden-Tower-04-05-CommonArea)
+        tower_num1 = tower_common_match.group(1)
+        tower_num2 = tower_common_match.group(2)
+        if tower_num2:
+            # Return a tuple of tower names to handle multiple towers
+            return (f"Tower {int(tower_num1)}", f"Tower {int(tower_num2)}")
+        else:
+            # Single tower CommonArea (e.g., Eden-Tower-04-CommonArea)
+            return f"Tower {int(tower_num1)}"
+
+    # Handle general CommonArea variations
+    if "CommonArea" in site or "Common Area" in site or "ED" in site:
+        return "Common_Area"
+
+    # Handle Eden-Tower-XX format
+    if site.startswith("Eden-Tower-"):
+        tower_num = site.split("Eden-Tower-")[1]
+        if tower_num.isdigit():
+            return f"Tower {int(tower_num)}"
+
+    # Handle regular tower names
+    tower_match = SITE_TOWER_RE.search(site)
+    if tower_match:
+        num = int(tower_match.group(1))
+        return f"Tower {num}"
+
+    return site
+
+
+@lru_cache(maxsize=4096)
+def _normalize_combined_site(site):
+    """Combined-report row for a site key ("Eden-Tower 04", Common_Area), or a pair of towers for a two-tower CommonArea."""
+    # Handle tower-specific CommonArea (e.g., Eden-Tower-04-CommonArea or Eden-Tower-04-05-CommonArea)
+    tower_common_match = TOWER_COMMON_AREA_RE.search(site)
+    if tower_common_match:
+        tower_num1 = tower_common_match.group(1).zfill(2)
+        tower_num2 = tower_common_match.group(2).zfill(2) if tower_common_match.group(2) else None
+        if tower_num2:
+            # Return a tuple for combined tower CommonArea
+            return (f"Eden-Tower {tower_num1}", f"Eden-Tower {tower_num2}")
+        else:
+            # Single tower CommonArea
+            return f"Eden-Tower {tower_num1}"
+
+    # Handle general CommonArea variations
+    if "CommonArea" in site or "Common Area" in site:
+        return "Common_Area"
+
+    # Handle Eden-Tower-XX format
+    if site.startswith("Eden-Tower-"):
+        tower_num = site.split("Eden-Tower-")[1]
+        if tower_num.isdigit():
+            return f"Eden-Tower {tower_num.zfill(2)}"
+
+    # Handle regular tower names
+    tower_match = SITE_TOWER_RE.search(site)
+    if tower_match:
+        num = tower_match.group(1).zfill(2)
+        return f"Eden-Tower {num}"
+
+    return site
+
+
+def _add_tower_formats(workbook, tower_colors):
+    """Per-site total/site/cell formats for the NCR summaries; sites sharing a spec share one Format."""
+    formats_by_spec = {}
+
+    def add_format(properties):
+        key = tuple(sorted(properties.items()))
+        if key not in formats_by_spec:
+            formats_by_spec[key] = workbook.add_format(properties)
+        return formats_by_spec[key]
+
+    return {
+        site: {
+            'tower_total': add_format({
+                'bold': True, 'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': color
+            }),
+            'site': add_format({
+                'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': '#FFFFFF'
+            }),
+            'cell': add_format({
+                'align': 'center', 'valign': 'vcenter', 'border': 1, 'text_wrap': True, 'fg_color': '#FFFFFF'
+            }),
+        }
+        for site, color in tower_colors.items()
+    }
+
+
+def _add_tower_report_formats(workbook):
+    """Formats shared by the Housekeeping and Safety sheets, created once per workbook."""
+    return {
+        "title": workbook.add_format({
             'bold': True, 'align': 'center', 'valign': 'vcenter', 'fg_color': 'yellow', 'border': 1, 'font_size': 12
-        })
-        header_format = workbook.add_format({
+        }),
+        "header": workbook.add_format({
             'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1, 'text_wrap': True
-        })
-        cell_format = workbook.add_format({
+        }),
+        "cell": workbook.add_format({
             'align': 'center', 'valign': 'vcenter', 'border': 1
-        })
-        site_format = workbook.add_format({
+        }),
+        "site": workbook.add_format({
             'align': 'left', 'valign': 'vcenter', 'border': 1
-        })
-        description_format = workbook.add_format({
+        }),
+        "description": workbook.add_format({
             'align': 'left', 'valign': 'vcenter', 'border': 1, 'text_wrap': True
-        })
-        
+        }),
+    }
+
+
+def _write_tower_report_sheets(workbook, formats, report_name, data, report_title, date_part, discipline_header_format=None):
+    """Write the per-tower summary and details sheets of a Housekeeping or Safety report into workbook."""
+    title_format = formats["title"]
+    header_format = formats["header"]
+    cell_format = formats["cell"]
+    site_format = formats["site"]
+    description_format = formats["description"]
+
+    summary_sheet_name = _truncate_sheet_name(f'{report_name} NCR Report {date_part}')
+    details_sheet_name = _truncate_sheet_name(f'{report_name} NCR Details {date_part}')
+
+    worksheet_summary = workbook.add_worksheet(summary_sheet_name)
+    worksheet_summary.set_column('A:A', 20)
+    worksheet_summary.set_column('B:B', 15)
+
+    standard_sites = [
+        "Eden-Tower 04", "Eden-Tower 05", "Eden-Tower 06", "Eden-Tower 07", "Common_Area"
+    ]
+
+    site_mapping = {k: _normalize_tower_site(k) for k in data.keys()}
+    # First original key for each normalized site, so lookups below are a dict get instead of a scan
+    original_keys = {}
+    for k, v in site_mapping.items():
+        original_keys.setdefault(v, k)
+    sorted_sites = sorted(standard_sites)
+
+    worksheet_summary.merge_range('A1:B1', report_title, title_format)
+    row = 1
+    worksheet_summary.write(row, 0, 'Site', header_format)
+    worksheet_summary.write(row, 1, f'No. of {report_name} NCRs beyond 7 days', header_format)
+
+    row = 2
+    for site in sorted_sites:
+        worksheet_summary.write(row, 0, site, site_format)
+        original_key = original_keys.get(site)
+        if original_key and original_key in data:
+            value = data[original_key].get("Count", 0)
+        else:
+            value = 0
+        worksheet_summary.write(row, 1, value, cell_format)
+        row += 1
+
+    worksheet_details = workbook.add_worksheet(details_sheet_name)
+    worksheet_details.set_column('A:A', 20)
+    worksheet_details.set_column('B:B', 60)
+    worksheet_details.set_column('C:D', 20)
+    worksheet_details.set_column('E:E', 15)
+    worksheet_details.set_column('F:F', 15)
+
+    worksheet_details.merge_range('A1:F1', f"{report_title} - Details", title_format)
+
+    headers = ['Site', 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status']
+    row = 1
+    worksheet_details.write_row(row, 0, headers, header_format)
+    worksheet_details.write(row, 5, 'Discipline', discipline_header_format or header_format)
+
+    write, write_row = worksheet_details.write, worksheet_details.write_row
+    row = 2
+    for site in sorted_sites:
+        original_key = original_keys.get(site)
+        if original_key and original_key in data:
+            site_data = data[original_key]
+            descriptions = site_data.get("Descriptions", [])
+            created_dates = site_data.get("Created Date (WET)", [])
+            close_dates = site_data.get("Expected Close Date (WET)", [])
+            statuses = site_data.get("Status", [])
+            for description, created_date, close_date, status in zip_longest(descriptions, created_dates, close_dates, statuses, fillvalue=""):
+                write(row, 0, site, site_format)
+                write(row, 1, description, description_format)
+                write_row(row, 2, [created_date, close_date, status, "HSE"], cell_format)
+                row += 1
+
+
+@st.cache_data
+def generate_consolidated_ncr_Housekeeping_excel_for_eden(combined_result, report_title="Housekeeping: Current Month"):
+    output = io.BytesIO()
+    # constant_memory flushes each row as the next one starts; every sheet
+    # below is written top to bottom, so nothing is lost.
+    with xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False}) as workbook:
         report_type = "Closed" if "Closed" in report_title else "Open"
-        now = datetime.now()  # April 25, 2025
-        day = now.strftime("%d")
-        month_name = now.strftime("%B")
-        year = now.strftime("%Y")
+        day, month_name, year = _report_date_parts(datetime.now().date())
         date_part = f"{day}_{month_name}_{year}"  # e.g., "25_April_2025"
         report_title = f"Housekeeping: {report_type} - {date_part}"
 
-        def truncate_sheet_name(base_name, max_length=31):
-            if len(base_name) > max_length:
-                return base_name[:max_length - 3] + "..."
-            return base_name
+        data = combined_result.get("Housekeeping", {}).get("Sites", {})
+        _write_tower_report_sheets(workbook, _add_tower_report_formats(workbook), "Housekeeping", data, report_title, date_part)
 
-        summary_sheet_name = truncate_sheet_name(f'Housekeeping NCR Report {date_part}')
-        details_sheet_name = truncate_sheet_name(f'Housekeeping NCR Details {date_part}')
+    output.seek(0)
+    return output
 
-        worksheet_summary = workbook.add_worksheet(summary_sheet_name)
-        worksheet_summary.set_column('A:A', 20)
-        worksheet_summary.set_column('B:B', 15)
-        
-        data = combined_result.get("Housekeeping", {}).get("Sites", {})
-        
-        standard_sites = [
-            "Eden-Tower 04", "Eden-Tower 05", "Eden-Tower 06", "Eden-Tower 07", "Common_Area"
-        ]
-        
-        def normalize_site_name(site):
-            if site == "Common_Area":
-                return site
-            if "CommonArea" in site or "Common Area" in site:
-                return "Common_Area"
-            match = re.search(r'(?:eden-)?(?:tower|t)[- ]?(\d+)', site, re.IGNORECASE)
-            if match:
-                num = match.group(1).zfill(2)
-                return f"Eden-Tower {num}"
-            return site
-
-        site_mapping = {k: normalize_site_name(k) for k in data.keys()}
-        sorted_sites = sorted(standard_sites)
-        
-        worksheet_summary.merge_range('A1:B1', report_title, title_format)
-        row = 1
-        worksheet_summary.write(row, 0, 'Site', header_format)
-        worksheet_summary.write(row, 1, 'No. of Housekeeping NCRs beyond 7 days', header_format)
-        
-        row = 2
-        for site in sorted_sites:
-            worksheet_summary.write(row, 0, site, site_format)
-            original_key = next((k for k, v in site_mapping.items() if v == site), None)
-            if original_key and original_key in data:
-                value = data[original_key].get("Count", 0)
-            else:
-                value = 0
-            worksheet_summary.write(row, 1, value, cell_format)
-            row += 1
-        
-        worksheet_details = workbook.add_worksheet(details_sheet_name)
-        worksheet_details.set_column('A:A', 20)
-        worksheet_details.set_column('B:B', 60)
-        worksheet_details.set_column('C:D', 20)
-        worksheet_details.set_column('E:E', 15)
-        worksheet_details.set_column('F:F', 15)
-        
-        worksheet_details.merge_range('A1:F1', f"{report_title} - Details", title_format)
-        
-        headers = ['Site', 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status', 'Discipline']
-        row = 1
-        for col, header in enumerate(headers):
-            worksheet_details.write(row, col, header, header_format)
-        
-        row = 2
-        for site in sorted_sites:
-            original_key = next((k for k, v in site_mapping.items() if v == site), None)
-            if original_key and original_key in data:
-                site_data = data[original_key]
-                descriptions = site_data.get("Descriptions", [])
-                created_dates = site_data.get("Created Date (WET)", [])
-                close_dates = site_data.get("Expected Close Date (WET)", [])
-                statuses = site_data.get("Status", [])
-                max_length = max(len(descriptions), len(created_dates), len(close_dates), len(statuses))
-                for i in range(max_length):
-                    worksheet_details.write(row, 0, site, site_format)
-                    worksheet_details.write(row, 1, descriptions[i] if i < len(descriptions) else "", description_format)
-                    worksheet_details.write(row, 2, created_dates[i] if i < len(created_dates) else "", cell_format)
-                    worksheet_details.write(row, 3, close_dates[i] if i < len(close_dates) else "", cell_format)
-                    worksheet_details.write(row, 4, statuses[i] if i < len(statuses) else "", cell_format)
-                    worksheet_details.write(row, 5, "HSE", cell_format)
-                    row += 1
-        
-        output.seek(0)
-        return output
-    
 @st.cache_data
 def generate_consolidated_ncr_Safety_excel_for_eden(combined_result, report_title=None):
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
-        
-        title_format = workbook.add_format({
-            'bold': True, 'align': 'center', 'valign': 'vcenter', 'fg_color': 'yellow', 'border': 1, 'font_size': 12
-        })
-        header_format = workbook.add_format({
-            'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1, 'text_wrap': True
-        })
-        cell_format = workbook.add_format({
-            'align': 'center', 'valign': 'vcenter', 'border': 1
-        })
-        site_format = workbook.add_format({
-            'align': 'left', 'valign': 'vcenter', 'border': 1
-        })
-        description_format = workbook.add_format({
-            'align': 'left', 'valign': 'vcenter', 'border': 1, 'text_wrap': True
-        })
-        
-        now = datetime.now()
-        day = now.strftime("%d")
-        month_name = now.strftime("%B")
-        year = now.strftime("%Y")
+    with xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False}) as workbook:
+        day, month_name, year = _report_date_parts(datetime.now().date())
         date_part = f"{month_name} {day}, {year}"
         if report_title is None:
             report_title = f"Safety: {date_part} - Current Month"
@@ -1437,99 +1675,19 @@ def generate_consolidated_ncr_Safety_excel_for_eden(combined_result, report_titl
             report_type = "Safety"
             report_title = f"{date_part}: {report_type}"
 
-        def truncate_sheet_name(base_name, max_length=31):
-            if len(base_name) > max_length:
-                return base_name[:max_length - 3] + "..."
-            return base_name
+        formats = _add_tower_report_formats(workbook)
+        data = combined_result.get("Safety", {}).get("Sites", {})
+        # The Safety details sheet highlights its Discipline header in the title style
+        _write_tower_report_sheets(workbook, formats, "Safety", data, report_title, date_part, discipline_header_format=formats["title"])
 
-        summary_sheet_name = truncate_sheet_name(f'Safety NCR Report {date_part}')
-        details_sheet_name = truncate_sheet_name(f'Safety NCR Details {date_part}')
+    output.seek(0)
+    return output
 
-        worksheet_summary = workbook.add_worksheet(summary_sheet_name)
-        worksheet_summary.set_column('A:A', 20)
-        worksheet_summary.set_column('B:B', 15)
-        
-        data = combined_result.get("Safety", {}).get("Sites", {})
-        
-        standard_sites = [
-            "Eden-Tower 04", "Eden-Tower 05", "Eden-Tower 06", "Eden-Tower 07", "Common_Area"
-        ]
-        
-        def normalize_site_name(site):
-            if site == "Common_Area":
-                return site
-            if "CommonArea" in site or "Common Area" in site:
-                return "Common_Area"
-            match = re.search(r'(?:eden-)?(?:tower|t)[- ]?(\d+)', site, re.IGNORECASE)
-            if match:
-                num = match.group(1).zfill(2)
-                return f"Eden-Tower {num}"
-            return site
-
-        site_mapping = {k: normalize_site_name(k) for k in data.keys()}
-        sorted_sites = sorted(standard_sites)
-        
-        worksheet_summary.merge_range('A1:B1', report_title, title_format)
-        row = 1
-        worksheet_summary.write(row, 0, 'Site', header_format)
-        worksheet_summary.write(row, 1, 'No. of Safety NCRs beyond 7 days', header_format)
-        
-        row = 2
-        for site in sorted_sites:
-            worksheet_summary.write(row, 0, site, site_format)
-            original_key = next((k for k, v in site_mapping.items() if v == site), None)
-            if original_key and original_key in data:
-                value = data[original_key].get("Count", 0)
-            else:
-                value = 0
-            worksheet_summary.write(row, 1, value, cell_format)
-            row += 1
-        
-        worksheet_details = workbook.add_worksheet(details_sheet_name)
-        worksheet_details.set_column('A:A', 20)
-        worksheet_details.set_column('B:B', 60)
-        worksheet_details.set_column('C:D', 20)
-        worksheet_details.set_column('E:E', 15)
-        worksheet_details.set_column('F:F', 15)
-
-        worksheet_details.merge_range('A1:F1', f"{report_title} - Details", title_format)
-        
-        headers = ['Site', 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status', 'Discipline']
-        row = 1
-        for col, header in enumerate(headers):
-            if col == 5:
-                worksheet_details.write(row, col, header, title_format)
-            else:
-                worksheet_details.write(row, col, header, header_format)
-        
-        row = 2
-        for site in sorted_sites:
-            original_key = next((k for k, v in site_mapping.items() if v == site), None)
-            if original_key and original_key in data:
-                site_data = data[original_key]
-                descriptions = site_data.get("Descriptions", [])
-                created_dates = site_data.get("Created Date (WET)", [])
-                close_dates = site_data.get("Expected Close Date (WET)", [])
-                statuses = site_data.get("Status", [])
-                max_length = max(len(descriptions), len(created_dates), len(close_dates), len(statuses))
-                for i in range(max_length):
-                    worksheet_details.write(row, 0, site, site_format)
-                    worksheet_details.write(row, 1, descriptions[i] if i < len(descriptions) else "", description_format)
-                    worksheet_details.write(row, 2, created_dates[i] if i < len(created_dates) else "", cell_format)
-                    worksheet_details.write(row, 3, close_dates[i] if i < len(close_dates) else "", cell_format)
-                    worksheet_details.write(row, 4, statuses[i] if i < len(statuses) else "", cell_format)
-                    worksheet_details.write(row, 5, "HSE", cell_format)
-                    row += 1
-        
-        output.seek(0)
-        return output
- 
 
 @st.cache_data
 def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_title="NCR"):
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
+    with xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False}) as workbook:
         
         # Define formatting styles
         title_format = workbook.add_format({
@@ -1558,35 +1716,15 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
         }
         
         # Create format dictionaries for each tower
-        tower_formats = {}
-        for site, color in tower_colors.items():
-            tower_formats[site] = {
-                'tower_total': workbook.add_format({
-                    'bold': True, 'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': color
-                }),
-                'site': workbook.add_format({
-                    'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': '#FFFFFF'
-                }),
-                'cell': workbook.add_format({
-                    'align': 'center', 'valign': 'vcenter', 'border': 1, 'text_wrap': True, 'fg_color': '#FFFFFF'
-                })
-            }
+        tower_formats = _add_tower_formats(workbook, tower_colors)
         
         default_cell_format = workbook.add_format(cell_format_base)
         default_site_format = workbook.add_format(site_format_base)
         
         # Generate date string
-        now = datetime.now()
-        day = now.strftime("%d")
-        month_name = now.strftime("%B")
-        year = now.strftime("%Y")
+        day, month_name, year = _report_date_parts(datetime.now().date())
         date_part = f"{day}_{month_name}_{year}"
         
-        def truncate_sheet_name(base_name, max_length=31):
-            if len(base_name) > max_length:
-                return base_name[:max_length - 3] + "..."
-            return base_name
-
         worksheet = workbook.add_worksheet('NCR Report')
         worksheet.set_column('A:A', 20)
         worksheet.set_column('B:H', 12)
@@ -1607,91 +1745,27 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
             "Common_Area"
         ]
         
-        def normalize_site_name(site):
-            # Handle tower-specific CommonArea (e.g., Eden-Tower-04-CommonArea or Eden-Tower-04-05-CommonArea)
-            tower_common_match = re.search(r'(?:eden-)?tower-(\d+)(?:-(\d+))?-commonarea', site, re.IGNORECASE)
-            if tower_common_match:
-                # If it's a combined tower CommonArea (e.g., Eden-Tower-04-05-CommonArea)
-                tower_num1 = tower_common_match.group(1)
-                tower_num2 = tower_common_match.group(2)
-                if tower_num2:
-                    # Return a tuple of tower names to handle multiple towers
-                    return (f"Tower {int(tower_num1)}", f"Tower {int(tower_num2)}")
-                else:
-                    # Single tower CommonArea (e.g., Eden-Tower-04-CommonArea)
-                    return f"Tower {int(tower_num1)}"
-            
-            # Handle general CommonArea variations
-            if "CommonArea" in site or "Common Area" in site or "ED" in site:
-                return "Common_Area"
-            
-            # Handle Eden-Tower-XX format
-            if site.startswith("Eden-Tower-"):
-                tower_num = site.split("Eden-Tower-")[1]
-                if tower_num.isdigit():
-                    return f"Tower {int(tower_num)}"
-            
-            # Handle regular tower names
-            tower_match = re.search(r'(?:eden-)?(?:tower|t)[- ]?(\d+)', site, re.IGNORECASE)
-            if tower_match:
-                num = int(tower_match.group(1))
-                return f"Tower {num}"
-            
-            return site
-
         # Create mapping for all sites
         all_sites = set(resolved_sites.keys()) | set(open_sites.keys())
         site_mapping = {}
         for k in all_sites:
-            normalized = normalize_site_name(k)
+            normalized = _normalize_ncr_site(k)
             if isinstance(normalized, tuple):
                 # For combined tower CommonAreas, map to both towers
                 for tower in normalized:
                     site_mapping.setdefault(k, []).append(tower)
             else:
                 site_mapping[k] = [normalized]
+        # Keys like Eden-Tower-04-05-CommonArea, matched once here rather than per site and per pass;
+        # common_keys adds every other CommonArea spelling, which the tower pour counts skip
+        tower_common_keys = {k for k in all_sites if TOWER_COMMON_AREA_RE.search(k)}
+        common_keys = tower_common_keys | {k for k in all_sites if "CommonArea" in k}
         
-        # Reverse mapping for finding original keys
-        def find_original_keys(normalized_site):
-            return [k for k, v in site_mapping.items() if normalized_site in v]
-        
-        def map_pour_to_level(pour_name):
-            """Map various pour name formats to standardized pour levels"""
-            if not pour_name:
-                return "common"
-            
-            pour_str = str(pour_name).strip().lower()
-            
-            # Handle Module X format
-            if pour_str.startswith("module "):
-                try:
-                    module_num = int(pour_str.split(" ")[1])
-                    if 1 <= module_num <= 2:  # Assuming 2 pour levels
-                        return f"Pour {module_num}"
-                except (IndexError, ValueError):
-                    pass
-            
-            # Handle Pour X format
-            elif pour_str.startswith("pour "):
-                try:
-                    pour_num = int(pour_str.split(" ")[1])
-                    if 1 <= pour_num <= 2:  # Assuming 2 pour levels
-                        return f"Pour {pour_num}"
-                except (IndexError, ValueError):
-                    pass
-            
-            # Handle direct numbers
-            elif pour_str.isdigit():
-                pour_num = int(pour_str)
-                if 1 <= pour_num <= 2:
-                    return f"Pour {pour_num}"
-            
-            # Handle common variations
-            elif pour_str in ["common", "general", "misc", "miscellaneous", ""]:
-                return "common"
-            
-            # Default to common for unrecognized formats
-            return "common"
+        # Reverse mapping for finding original keys, built once instead of scanning site_mapping per site
+        reverse_mapping = defaultdict(list)
+        for k, v in site_mapping.items():
+            for normalized_site in dict.fromkeys(v):
+                reverse_mapping[normalized_site].append(k)
         
         # Write header
         worksheet.merge_range('A1:H1', f"{report_title} {date_part}", title_format)
@@ -1715,12 +1789,14 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
         
         row = 3
         site_totals = {}
+        # Grey total row for any site without its own colours; created once, not per site
+        default_tower_total_format = workbook.add_format({
+            'bold': True, 'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': '#D3D3D3'
+        })
     
         for site in standard_sites:
             formats = tower_formats.get(site, {})
-            tower_total_format = formats.get('tower_total', workbook.add_format({
-                'bold': True, 'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': '#D3D3D3'
-            }))
+            tower_total_format = formats.get('tower_total', default_tower_total_format)
             site_format = formats.get('site', default_site_format)
             cell_format = formats.get('cell', default_cell_format)
             
@@ -1728,131 +1804,68 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
             open_counts = {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0}
             
             # Find all original keys that map to this normalized site
-            original_keys = find_original_keys(site)
+            original_keys = reverse_mapping.get(site, [])
             
             # --- Corrected Code ---
             if site == "Common_Area":
                 # Handle Common_Area specifically
                 for original_key in original_keys:
                     # Skip tower-specific CommonAreas, as they are handled under each tower
-                    if re.search(r'(?:eden-)?tower-\d+(?:-\d+)?-commonarea', original_key, re.IGNORECASE):
+                    if original_key in tower_common_keys:
                         continue
                     
                     # Correctly read pre-aggregated counts for resolved/closed records
-                    if original_key in resolved_sites:
-                        site_data = resolved_sites[original_key]
+                    site_data = resolved_sites.get(original_key)
+                    if site_data:
                         resolved_counts['Civil Finishing'] += site_data.get("FW", 0)
                         resolved_counts['Structure Works'] += site_data.get("SW", 0)
                         resolved_counts['MEP'] += site_data.get("MEP", 0)
 
                     # Correctly read pre-aggregated counts for open records
-                    if original_key in open_sites:
-                        site_data = open_sites[original_key]
+                    site_data = open_sites.get(original_key)
+                    if site_data:
                         open_counts['Civil Finishing'] += site_data.get("FW", 0)
                         open_counts['Structure Works'] += site_data.get("SW", 0)
                         open_counts['MEP'] += site_data.get("MEP", 0)
                     
                     # Open data
-                    if original_key in open_sites:
-                        site_data = open_sites[original_key]
-                        disciplines = site_data.get("Discipline", [])
-                        for discipline in disciplines:
-                            if discipline == 'SW':
-                                open_counts['Structure Works'] += 1
-                            elif discipline == 'FW':
-                                open_counts['Civil Finishing'] += 1
-                            elif discipline in ['MEP', 'HSE']:
-                                open_counts['MEP'] += 1
+                    site_data = open_sites.get(original_key)
+                    if site_data:
+                        for discipline in site_data.get("Discipline", ()):
+                            cat = DISCIPLINE_TO_CATEGORY.get(discipline)
+                            if cat:
+                                open_counts[cat] += 1
             
             else:  # Tower sites
                 resolved_pour_counts = {level: {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0} for level in pour_levels}
                 open_pour_counts = {level: {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0} for level in pour_levels}
-                resolved_common_counts = {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0}
-                open_common_counts = {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0}
+                resolved_common_counts = Counter({'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0})
+                open_common_counts = Counter({'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0})
                 
                 # Process each original key that maps to this tower
                 for original_key in original_keys:
-                    # Process regular tower data (not CommonArea)
-                    if not re.search(r'(?:eden-)?tower-\d+(?:-\d+)?-commonarea', original_key, re.IGNORECASE) and "CommonArea" not in original_key:
-                        # Process resolved data
-                        if original_key in resolved_sites:
-                            site_data = resolved_sites[original_key]
-                            disciplines = site_data.get("Discipline", [])
-                            pours = site_data.get("Pours", [])
-                            
-                            for i, discipline in enumerate(disciplines):
-                                if discipline == 'SW':
-                                    cat = 'Structure Works'
-                                elif discipline == 'FW':
-                                    cat = 'Civil Finishing'
-                                elif discipline in ['MEP', 'HSE']:
-                                    cat = 'MEP'
-                                else:
-                                    cat = 'Structure Works'
-                                
-                                pour_list = pours[i] if i < len(pours) else ['Common']
-                                for pour in pour_list:
-                                    pour_level = map_pour_to_level(pour)
-                                    if pour_level in pour_levels:
-                                        resolved_pour_counts[pour_level][cat] += 1
-                                    else:
-                                        resolved_common_counts[cat] += 1
-                        
-                        # Process open data
-                        if original_key in open_sites:
-                            site_data = open_sites[original_key]
-                            disciplines = site_data.get("Discipline", [])
-                            pours = site_data.get("Pours", [])
-                            
-                            for i, discipline in enumerate(disciplines):
-                                if discipline == 'SW':
-                                    cat = 'Structure Works'
-                                elif discipline == 'FW':
-                                    cat = 'Civil Finishing'
-                                elif discipline in ['MEP', 'HSE']:
-                                    cat = 'MEP'
-                                else:
-                                    cat = 'Structure Works'
-                                
-                                pour_list = pours[i] if i < len(pours) else ['Common']
-                                for pour in pour_list:
-                                    pour_level = map_pour_to_level(pour)
-                                    if pour_level in pour_levels:
-                                        open_pour_counts[pour_level][cat] += 1
-                                    else:
-                                        open_common_counts[cat] += 1
-                    
-                    # Process tower-specific CommonArea data
-                    if re.search(r'(?:eden-)?tower-\d+(?:-\d+)?-commonarea', original_key, re.IGNORECASE):
+                    # Tower-specific CommonArea keys only feed the common counts;
+                    # every other non-common key is a regular tower key with pours.
+                    if original_key in tower_common_keys:
                         # Resolved data
-                        if original_key in resolved_sites:
-                            site_data = resolved_sites[original_key]
-                            disciplines = site_data.get("Discipline", [])
-                            for discipline in disciplines:
-                                if discipline == 'SW':
-                                    cat = 'Structure Works'
-                                elif discipline == 'FW':
-                                    cat = 'Civil Finishing'
-                                elif discipline in ['MEP', 'HSE']:
-                                    cat = 'MEP'
-                                else:
-                                    cat = 'Structure Works'
-                                resolved_common_counts[cat] += 1
+                        site_data = resolved_sites.get(original_key)
+                        if site_data:
+                            resolved_common_counts.update(DISCIPLINE_TO_CATEGORY.get(d, 'Structure Works') for d in site_data.get("Discipline", ()))
                         
                         # Open data
-                        if original_key in open_sites:
-                            site_data = open_sites[original_key]
-                            disciplines = site_data.get("Discipline", [])
-                            for discipline in disciplines:
-                                if discipline == 'SW':
-                                    cat = 'Structure Works'
-                                elif discipline == 'FW':
-                                    cat = 'Civil Finishing'
-                                elif discipline in ['MEP', 'HSE']:
-                                    cat = 'MEP'
-                                else:
-                                    cat = 'Structure Works'
-                                open_common_counts[cat] += 1
+                        site_data = open_sites.get(original_key)
+                        if site_data:
+                            open_common_counts.update(DISCIPLINE_TO_CATEGORY.get(d, 'Structure Works') for d in site_data.get("Discipline", ()))
+                    elif original_key not in common_keys:
+                        # Process resolved data
+                        site_data = resolved_sites.get(original_key)
+                        if site_data:
+                            _tally_pours(site_data, resolved_pour_counts, resolved_common_counts, 'Structure Works')
+                        
+                        # Process open data
+                        site_data = open_sites.get(original_key)
+                        if site_data:
+                            _tally_pours(site_data, open_pour_counts, open_common_counts, 'Structure Works')
                 
                 # Aggregate pour and CommonArea counts for tower total
                 for cat in categories:
@@ -1863,12 +1876,12 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
             
             # Write tower header row
             display_site = site if site == "Common_Area" else site
-            worksheet.write(row, 0, display_site, tower_total_format)
+            worksheet.write_string(row, 0, display_site, tower_total_format)
             for i, cat in enumerate(categories):
-                worksheet.write(row, i+1, resolved_counts[cat], cell_format)
+                worksheet.write_number(row, i+1, resolved_counts[cat], cell_format)
             for i, cat in enumerate(categories):
-                worksheet.write(row, i+4, open_counts[cat], cell_format)
-            worksheet.write(row, 7, site_total, cell_format)
+                worksheet.write_number(row, i+4, open_counts[cat], cell_format)
+            worksheet.write_number(row, 7, site_total, cell_format)
             site_totals[site] = site_total
             row += 1
             
@@ -1876,27 +1889,27 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
             if site != "Common_Area":
                 for idx, level in enumerate(pour_levels, 1):
                     level_total = sum(resolved_pour_counts[level].values()) + sum(open_pour_counts[level].values())
-                    worksheet.write(row, 0, f"Pour {idx}", site_format)
+                    worksheet.write_string(row, 0, f"Pour {idx}", site_format)
                     for i, display_cat in enumerate(categories):
-                        worksheet.write(row, i+1, resolved_pour_counts[level][display_cat], cell_format)
+                        worksheet.write_number(row, i+1, resolved_pour_counts[level][display_cat], cell_format)
                     for i, cat in enumerate(categories):
-                        worksheet.write(row, i+4, open_pour_counts[level][cat], cell_format)
-                    worksheet.write(row, 7, level_total, cell_format)
+                        worksheet.write_number(row, i+4, open_pour_counts[level][cat], cell_format)
+                    worksheet.write_number(row, 7, level_total, cell_format)
                     row += 1
                 
                 # Add tower-specific Common Description row
                 common_total = sum(resolved_common_counts.values()) + sum(open_common_counts.values())
                 common_desc = "Common Description"
-                worksheet.write(row, 0, common_desc, site_format)
+                worksheet.write_string(row, 0, common_desc, site_format)
                 for i, display_cat in enumerate(categories):
-                    worksheet.write(row, i+1, resolved_common_counts[display_cat], cell_format)
+                    worksheet.write_number(row, i+1, resolved_common_counts[display_cat], cell_format)
                 for i, cat in enumerate(categories):
-                    worksheet.write(row, i+4, open_common_counts[cat], cell_format)
-                worksheet.write(row, 7, common_total, cell_format)
+                    worksheet.write_number(row, i+4, open_common_counts[cat], cell_format)
+                worksheet.write_number(row, 7, common_total, cell_format)
                 row += 1
 
         def write_detail_sheet(sheet_name, data, title):
-            truncated_sheet_name = truncate_sheet_name(f"{sheet_name} {date_part}")
+            truncated_sheet_name = _truncate_sheet_name(f"{sheet_name} {date_part}")
             detail_worksheet = workbook.add_worksheet(truncated_sheet_name)
             detail_worksheet.set_column('A:A', 20)
             detail_worksheet.set_column('B:B', 60)
@@ -1907,6 +1920,8 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
             headers = ['Site', 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status', 'Discipline']
             for col, detail in enumerate(headers):
                 detail_worksheet.write(1, col, detail, header_format)
+            # Bound once, since the loop below makes two calls per record
+            write, write_row = detail_worksheet.write, detail_worksheet.write_row
             row = 2
             for site, site_data in data.items():
                 normalized_sites = site_mapping.get(site, [site])
@@ -1918,14 +1933,10 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
                     close_dates = site_data.get("Expected Close Date (WET)", [])
                     statuses = site_data.get("Status", [])
                     disciplines = site_data.get("Discipline", [])
-                    max_length = max(len(descriptions), len(created_dates), len(close_dates), len(statuses), len(disciplines))
-                    for i in range(max_length):
-                        detail_worksheet.write(row, 0, display_site, default_site_format)
-                        detail_worksheet.write(row, 1, descriptions[i] if i < len(descriptions) else "", default_cell_format)
-                        detail_worksheet.write(row, 2, created_dates[i] if i < len(created_dates) else "", default_cell_format)
-                        detail_worksheet.write(row, 3, close_dates[i] if i < len(close_dates) else "", default_cell_format)
-                        detail_worksheet.write(row, 4, statuses[i] if i < len(statuses) else "", default_cell_format)
-                        detail_worksheet.write(row, 5, disciplines[i] if i < len(disciplines) else "", default_cell_format)
+                    # Columns B-F share one format, so each zipped record goes to write_row as is
+                    for record in zip_longest(descriptions, created_dates, close_dates, statuses, disciplines, fillvalue=""):
+                        write(row, 0, display_site, default_site_format)
+                        write_row(row, 1, record, default_cell_format)
                         row += 1
 
         if resolved_sites:
@@ -1933,14 +1944,22 @@ def generate_consolidated_ncr_OpenClose_excel_for_eden(combined_result, report_t
         if open_sites:
             write_detail_sheet("Open NCR Details", open_sites, "Open NCR Details")
 
-        output.seek(0)
-        return output
+    output.seek(0)
+    return output
     
-@st.cache_data
+def _reports_digest(all_reports):
+    # One json.dumps pass is far cheaper than st.cache_data hashing the nested report dicts itself
+    return hashlib.sha256(json.dumps(all_reports, default=repr).encode()).hexdigest()
+
 def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Reports"):
+    """Build the all-reports workbook, cached on a digest of the report dicts."""
+    return _generate_combined_excel_report(_reports_digest(all_reports), all_reports, filename_prefix)
+
+@st.cache_data
+def _generate_combined_excel_report(report_digest, _all_reports, filename_prefix):
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
+    # Like the standalone exports, every sheet here is written top to bottom, so rows can be flushed as they go
+    with xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False}) as workbook:
         
         # Formatting
         title_format = workbook.add_format({
@@ -1968,19 +1987,7 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             "Common_Area": '#C7CEEA'     # Periwinkle
         }
         
-        tower_formats = {}
-        for site, color in tower_colors.items():
-            tower_formats[site] = {
-                'tower_total': workbook.add_format({
-                    'bold': True, 'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': color
-                }),
-                'site': workbook.add_format({
-                    'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': '#FFFFFF'
-                }),
-                'cell': workbook.add_format({
-                    'align': 'center', 'valign': 'vcenter', 'border': 1, 'text_wrap': True, 'fg_color': '#FFFFFF'
-                })
-            }
+        tower_formats = _add_tower_formats(workbook, tower_colors)
         
         default_cell_format = workbook.add_format(cell_format_base)
         default_site_format = workbook.add_format(site_format_base)
@@ -1991,88 +1998,11 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
         })
         
         # Date handling
-        now = datetime.now()
-        day = now.strftime("%d")
-        month_name = now.strftime("%B")
-        year = now.strftime("%Y")
+        day, month_name, year = _report_date_parts(datetime.now().date())
         date_part = f"{day}_{month_name}_{year}"
         
-        def truncate_sheet_name(base_name, max_length=31):
-            if len(base_name) > max_length:
-                return base_name[:max_length - 3] + "..."
-            return base_name
-
-        # Helper function to map pour names
-        def map_pour_to_level(pour_name):
-            if not pour_name:
-                return "common"
-            
-            pour_str = str(pour_name).strip().lower()
-            
-            # Handle Module X format
-            if pour_str.startswith("module "):
-                try:
-                    module_num = int(pour_str.split(" ")[1])
-                    if 1 <= module_num <= 2:
-                        return f"Pour {module_num}"
-                except (IndexError, ValueError):
-                    pass
-            
-            # Handle Pour X format
-            elif pour_str.startswith("pour "):
-                try:
-                    pour_num = int(pour_str.split(" ")[1])
-                    if 1 <= pour_num <= 2:
-                        return f"Pour {pour_num}"
-                except (IndexError, ValueError):
-                    pass
-            
-            # Handle direct numbers
-            elif pour_str.isdigit():
-                pour_num = int(pour_str)
-                if 1 <= pour_num <= 2:
-                    return f"Pour {pour_num}"
-            
-            # Handle common variations
-            elif pour_str in ["common", "general", "misc", "miscellaneous", ""]:
-                return "common"
-            
-            return "common"
-
-        # Modified normalize_site_name to support combined tower Common Areas
-        def normalize_site_name(site):
-            # Handle tower-specific CommonArea (e.g., Eden-Tower-04-CommonArea or Eden-Tower-04-05-CommonArea)
-            tower_common_match = re.search(r'(?:eden-)?tower-(\d+)(?:-(\d+))?-commonarea', site, re.IGNORECASE)
-            if tower_common_match:
-                tower_num1 = tower_common_match.group(1).zfill(2)
-                tower_num2 = tower_common_match.group(2).zfill(2) if tower_common_match.group(2) else None
-                if tower_num2:
-                    # Return a tuple for combined tower CommonArea
-                    return (f"Eden-Tower {tower_num1}", f"Eden-Tower {tower_num2}")
-                else:
-                    # Single tower CommonArea
-                    return f"Eden-Tower {tower_num1}"
-            
-            # Handle general CommonArea variations
-            if "CommonArea" in site or "Common Area" in site:
-                return "Common_Area"
-            
-            # Handle Eden-Tower-XX format
-            if site.startswith("Eden-Tower-"):
-                tower_num = site.split("Eden-Tower-")[1]
-                if tower_num.isdigit():
-                    return f"Eden-Tower {tower_num.zfill(2)}"
-            
-            # Handle regular tower names
-            tower_match = re.search(r'(?:eden-)?(?:tower|t)[- ]?(\d+)', site, re.IGNORECASE)
-            if tower_match:
-                num = tower_match.group(1).zfill(2)
-                return f"Eden-Tower {num}"
-            
-            return site
-
         # 1. Combined NCR Report
-        combined_result = all_reports.get("Combined_NCR", {})
+        combined_result = _all_reports.get("Combined_NCR", {})
         report_title_ncr = f"NCR: {date_part}"
         
         worksheet = workbook.add_worksheet('NCR Report')
@@ -2097,17 +2027,23 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
         all_sites = set(resolved_sites.keys()) | set(open_sites.keys())
         site_mapping = {}
         for k in all_sites:
-            normalized = normalize_site_name(k)
+            normalized = _normalize_combined_site(k)
             if isinstance(normalized, tuple):
                 # For combined tower CommonAreas, map to both towers
                 for tower in normalized:
                     site_mapping.setdefault(k, []).append(tower)
             else:
                 site_mapping[k] = [normalized]
+        # Keys like Eden-Tower-04-05-CommonArea, matched once here rather than per site and per pass;
+        # common_keys adds every other CommonArea spelling, which the tower pour counts skip
+        tower_common_keys = {k for k in all_sites if TOWER_COMMON_AREA_RE.search(k)}
+        common_keys = tower_common_keys | {k for k in all_sites if "CommonArea" in k}
         
-        # Helper function to find original keys
-        def find_original_keys(normalized_site):
-            return [k for k, v in site_mapping.items() if normalized_site in v]
+        # Reverse mapping for finding original keys, built once instead of scanning site_mapping per site
+        reverse_mapping = defaultdict(list)
+        for k, v in site_mapping.items():
+            for normalized_site in dict.fromkeys(v):
+                reverse_mapping[normalized_site].append(k)
         
         worksheet.merge_range('A1:H1', report_title_ncr, title_format)
         row = 1
@@ -2125,20 +2061,16 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             worksheet.write(row, i+4, cat, subheader_format)
         worksheet.write(row, 7, '', header_format)
         
-        category_map = {
-            'Civil Finishing': ['FW', 'Civil Finishing', 'Finishing', 'Civil'],
-            'Structure Works': ['SW', 'Structure Works', 'Structure', 'Works', 'Structural'],
-            'MEP': ['MEP', 'Electrical', 'Mechanical', 'Plumbing', 'HSE']
-        }
         pour_levels = ['Pour 1', 'Pour 2']
         row = 3
         site_totals = {}
+        default_tower_total_format = workbook.add_format({
+            'bold': True, 'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': '#D3D3D3'
+        })
         
         for site in standard_sites:
             formats = tower_formats.get(site, {})
-            tower_total_format = formats.get('tower_total', workbook.add_format({
-                'bold': True, 'align': 'left', 'valign': 'vcenter', 'border': 1, 'fg_color': '#D3D3D3'
-            }))
+            tower_total_format = formats.get('tower_total', default_tower_total_format)
             site_format = formats.get('site', default_site_format)
             cell_format = formats.get('cell', default_cell_format)
             
@@ -2146,26 +2078,26 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             open_counts = {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0}
             
             # Find all original keys that map to this normalized site
-            original_keys = find_original_keys(site)
+            original_keys = reverse_mapping.get(site, [])
             
             # --- Corrected Code ---
             if site == "Common_Area":
                 # Handle Common_Area specifically
                 for original_key in original_keys:
                     # This check correctly skips tower-specific common areas
-                    if re.search(r'(?:eden-)?tower-\d+(?:-\d+)?-commonarea', original_key, re.IGNORECASE):
+                    if original_key in tower_common_keys:
                         continue
 
                     # Correctly read the pre-aggregated counts for resolved/closed records
-                    if original_key in resolved_sites:
-                        site_data = resolved_sites[original_key]
+                    site_data = resolved_sites.get(original_key)
+                    if site_data:
                         resolved_counts['Civil Finishing'] += site_data.get("FW", 0)
                         resolved_counts['Structure Works'] += site_data.get("SW", 0)
                         resolved_counts['MEP'] += site_data.get("MEP", 0)
 
                     # Correctly read the pre-aggregated counts for open records
-                    if original_key in open_sites:
-                        site_data = open_sites[original_key]
+                    site_data = open_sites.get(original_key)
+                    if site_data:
                         open_counts['Civil Finishing'] += site_data.get("FW", 0)
                         open_counts['Structure Works'] += site_data.get("SW", 0)
                         open_counts['MEP'] += site_data.get("MEP", 0)
@@ -2173,56 +2105,33 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             else:  # Tower sites
                 resolved_pour_counts = {level: {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0} for level in pour_levels}
                 open_pour_counts = {level: {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0} for level in pour_levels}
-                resolved_common_counts = {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0}
-                open_common_counts = {'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0}
+                resolved_common_counts = Counter({'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0})
+                open_common_counts = Counter({'Civil Finishing': 0, 'Structure Works': 0, 'MEP': 0})
                 
                 # Process each original key that maps to this tower
                 for original_key in original_keys:
-                    # Process regular tower data (not CommonArea)
-                    if not re.search(r'(?:eden-)?tower-\d+(?:-\d+)?-commonarea', original_key, re.IGNORECASE) and "CommonArea" not in original_key:
+                    # Tower-specific CommonArea keys only feed the common counts;
+                    # every other non-common key is a regular tower key with pours.
+                    if original_key in tower_common_keys:
                         # Resolved data
-                        if original_key in resolved_sites:
-                            disciplines = resolved_sites[original_key].get("Discipline", [])
-                            pours = resolved_sites[original_key].get("Pours", [])
-                            for i, discipline in enumerate(disciplines):
-                                pour_list = pours[i] if i < len(pours) else ['Common']
-                                cat = 'Civil Finishing' if discipline == 'FW' else 'Structure Works' if discipline == 'SW' else 'MEP'
-                                for pour in pour_list:
-                                    pour_level = map_pour_to_level(pour)
-                                    if pour_level in pour_levels:
-                                        resolved_pour_counts[pour_level][cat] += 1
-                                    else:
-                                        resolved_common_counts[cat] += 1
+                        site_data = resolved_sites.get(original_key)
+                        if site_data:
+                            resolved_common_counts.update(DISCIPLINE_TO_CATEGORY.get(d, 'MEP') for d in site_data.get("Discipline", ()))
                         
                         # Open data
-                        if original_key in open_sites:
-                            disciplines = open_sites[original_key].get("Discipline", [])
-                            pours = open_sites[original_key].get("Pours", [])
-                            for i, discipline in enumerate(disciplines):
-                                pour_list = pours[i] if i < len(pours) else ['Common']
-                                cat = 'Civil Finishing' if discipline == 'FW' else 'Structure Works' if discipline == 'SW' else 'MEP'
-                                for pour in pour_list:
-                                    pour_level = map_pour_to_level(pour)
-                                    if pour_level in pour_levels:
-                                        open_pour_counts[pour_level][cat] += 1
-                                    else:
-                                        open_common_counts[cat] += 1
-                    
-                    # Process tower-specific CommonArea data
-                    if re.search(r'(?:eden-)?tower-\d+(?:-\d+)?-commonarea', original_key, re.IGNORECASE):
+                        site_data = open_sites.get(original_key)
+                        if site_data:
+                            open_common_counts.update(DISCIPLINE_TO_CATEGORY.get(d, 'MEP') for d in site_data.get("Discipline", ()))
+                    elif original_key not in common_keys:
                         # Resolved data
-                        if original_key in resolved_sites:
-                            disciplines = resolved_sites[original_key].get("Discipline", [])
-                            for discipline in disciplines:
-                                cat = 'Civil Finishing' if discipline == 'FW' else 'Structure Works' if discipline == 'SW' else 'MEP'
-                                resolved_common_counts[cat] += 1
+                        site_data = resolved_sites.get(original_key)
+                        if site_data:
+                            _tally_pours(site_data, resolved_pour_counts, resolved_common_counts, 'MEP')
                         
                         # Open data
-                        if original_key in open_sites:
-                            disciplines = open_sites[original_key].get("Discipline", [])
-                            for discipline in disciplines:
-                                cat = 'Civil Finishing' if discipline == 'FW' else 'Structure Works' if discipline == 'SW' else 'MEP'
-                                open_common_counts[cat] += 1
+                        site_data = open_sites.get(original_key)
+                        if site_data:
+                            _tally_pours(site_data, open_pour_counts, open_common_counts, 'MEP')
                 
                 # Aggregate pour and CommonArea counts
                 for cat in categories:
@@ -2231,39 +2140,39 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             
             site_total = sum(resolved_counts.values()) + sum(open_counts.values())
             
-            worksheet.write(row, 0, site, tower_total_format)
+            worksheet.write_string(row, 0, site, tower_total_format)
             for i, display_cat in enumerate(categories):
-                worksheet.write(row, i+1, resolved_counts[display_cat], cell_format)
+                worksheet.write_number(row, i+1, resolved_counts[display_cat], cell_format)
             for i, display_cat in enumerate(categories):
-                worksheet.write(row, i+4, open_counts[display_cat], cell_format)
-            worksheet.write(row, 7, site_total, cell_format)
+                worksheet.write_number(row, i+4, open_counts[display_cat], cell_format)
+            worksheet.write_number(row, 7, site_total, cell_format)
             site_totals[site] = site_total
             row += 1
             
             if "Tower" in site and site != "Common_Area":
                 for idx, level in enumerate(pour_levels, 1):
                     level_total = sum(resolved_pour_counts[level].values()) + sum(open_pour_counts[level].values())
-                    worksheet.write(row, 0, f"Pour {idx}", site_format)
+                    worksheet.write_string(row, 0, f"Pour {idx}", site_format)
                     for i, display_cat in enumerate(categories):
-                        worksheet.write(row, i+1, resolved_pour_counts[level][display_cat], cell_format)
+                        worksheet.write_number(row, i+1, resolved_pour_counts[level][display_cat], cell_format)
                     for i, display_cat in enumerate(categories):
-                        worksheet.write(row, i+4, open_pour_counts[level][display_cat], cell_format)
-                    worksheet.write(row, 7, level_total, cell_format)
+                        worksheet.write_number(row, i+4, open_pour_counts[level][display_cat], cell_format)
+                    worksheet.write_number(row, 7, level_total, cell_format)
                     row += 1
                 
                 common_total = sum(resolved_common_counts.values()) + sum(open_common_counts.values())
                 common_desc = "Common Description"
-                worksheet.write(row, 0, common_desc, site_format)
+                worksheet.write_string(row, 0, common_desc, site_format)
                 for i, display_cat in enumerate(categories):
-                    worksheet.write(row, i+1, resolved_common_counts[display_cat], cell_format)
+                    worksheet.write_number(row, i+1, resolved_common_counts[display_cat], cell_format)
                 for i, display_cat in enumerate(categories):
-                    worksheet.write(row, i+4, open_common_counts[display_cat], cell_format)
-                worksheet.write(row, 7, common_total, cell_format)
+                    worksheet.write_number(row, i+4, open_common_counts[display_cat], cell_format)
+                worksheet.write_number(row, 7, common_total, cell_format)
                 row += 1
 
         # Combined NCR Detail Sheets
         def write_detail_sheet(sheet_name, data, title):
-            truncated_sheet_name = truncate_sheet_name(f"{sheet_name} {date_part}")
+            truncated_sheet_name = _truncate_sheet_name(f"{sheet_name} {date_part}")
             detail_worksheet = workbook.add_worksheet(truncated_sheet_name)
             detail_worksheet.set_column('A:A', 20)
             detail_worksheet.set_column('B:B', 60)
@@ -2274,6 +2183,8 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             headers = ['Site', 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status', 'Discipline']
             for col, header in enumerate(headers):
                 detail_worksheet.write(1, col, header, header_format)
+            # Bound once, since the loop below makes three calls per record
+            write, write_row = detail_worksheet.write, detail_worksheet.write_row
             row = 2
             for site, site_data in data.items():
                 normalized_sites = site_mapping.get(site, [site])
@@ -2284,14 +2195,10 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
                     close_dates = site_data.get("Expected Close Date (WET)", [])
                     statuses = site_data.get("Status", [])
                     disciplines = site_data.get("Discipline", [])
-                    max_length = max(len(descriptions), len(created_dates), len(close_dates), len(statuses), len(disciplines))
-                    for i in range(max_length):
-                        detail_worksheet.write(row, 0, display_site, default_site_format)
-                        detail_worksheet.write(row, 1, descriptions[i] if i < len(descriptions) else "", description_format)
-                        detail_worksheet.write(row, 2, created_dates[i] if i < len(created_dates) else "", default_cell_format)
-                        detail_worksheet.write(row, 3, close_dates[i] if i < len(close_dates) else "", default_cell_format)
-                        detail_worksheet.write(row, 4, statuses[i] if i < len(statuses) else "", default_cell_format)
-                        detail_worksheet.write(row, 5, disciplines[i] if i < len(disciplines) else "", default_cell_format)
+                    for description, created_date, close_date, status, discipline in zip_longest(descriptions, created_dates, close_dates, statuses, disciplines, fillvalue=""):
+                        write(row, 0, display_site, default_site_format)
+                        write(row, 1, description, description_format)
+                        write_row(row, 2, [created_date, close_date, status, discipline], default_cell_format)
                         row += 1
 
         if resolved_sites:
@@ -2301,7 +2208,7 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
 
         # 2. Safety and Housekeeping Reports
         def write_safety_housekeeping_report(report_type, data, report_title, sheet_type):
-            worksheet = workbook.add_worksheet(truncate_sheet_name(f'{report_type} NCR {sheet_type} {date_part}'))
+            worksheet = workbook.add_worksheet(_truncate_sheet_name(f'{report_type} NCR {sheet_type} {date_part}'))
             worksheet.set_column('A:A', 20)
             worksheet.set_column('B:B', 15)
             worksheet.merge_range('A1:B1', f"{report_title} - {sheet_type}", title_format)
@@ -2311,24 +2218,29 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             sites_data = data.get(report_type, {}).get("Sites", {})
             site_mapping_safety = {}
             for k in sites_data.keys():
-                normalized = normalize_site_name(k)
+                normalized = _normalize_combined_site(k)
                 if isinstance(normalized, tuple):
                     for tower in normalized:
                         site_mapping_safety.setdefault(k, []).append(tower)
                 else:
                     site_mapping_safety[k] = [normalized]
+            keys_by_site = defaultdict(list)
+            for k, v_list in site_mapping_safety.items():
+                for v in v_list:
+                    keys_by_site[v].append(k)
+            tower_common_keys = {k for k in sites_data if TOWER_COMMON_AREA_RE.search(k)}
             
             row = 2
             for site in standard_sites:
-                original_keys = [k for k, v_list in site_mapping_safety.items() for v in v_list if v == site]
+                original_keys = keys_by_site.get(site, [])
                 # Simply sum the counts for all matching keys without the incorrect 'if' condition
                 value = sum(sites_data.get(k, {}).get("Count", 0) for k in original_keys)
 
                 worksheet.write(row, 0, site, default_site_format)
-                worksheet.write(row, 1, value, default_cell_format)
+                worksheet.write_number(row, 1, value, default_cell_format)
                 row += 1
             
-            worksheet_details = workbook.add_worksheet(truncate_sheet_name(f'{report_type} NCR {sheet_type} Details {date_part}'))
+            worksheet_details = workbook.add_worksheet(_truncate_sheet_name(f'{report_type} NCR {sheet_type} Details {date_part}'))
             worksheet_details.set_column('A:A', 20)
             worksheet_details.set_column('B:B', 60)
             worksheet_details.set_column('C:D', 20)
@@ -2339,36 +2251,84 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
             row = 1
             for col, header in enumerate(headers):
                 worksheet_details.write(row, col, header, header_format)
+            write, write_row = worksheet_details.write, worksheet_details.write_row
             for site in standard_sites:
-                original_keys = [k for k, v_list in site_mapping_safety.items() for v in v_list if v == site]
+                original_keys = keys_by_site.get(site, [])
                 for original_key in original_keys:
-                    if not re.search(r'(?:eden-)?tower-\d+(?:-\d+)?-commonarea', original_key, re.IGNORECASE) or site != "Common_Area":
+                    if original_key not in tower_common_keys or site != "Common_Area":
                         site_data = sites_data.get(original_key, {})
                         descriptions = site_data.get("Descriptions", [])
                         created_dates = site_data.get("Created Date (WET)", [])
                         close_dates = site_data.get("Expected Close Date (WET)", [])
                         statuses = site_data.get("Status", [])
-                        max_length = max(len(descriptions), len(created_dates), len(close_dates), len(statuses))
-                        for i in range(max_length):
-                            worksheet_details.write(row, 0, site, default_site_format)
-                            worksheet_details.write(row, 1, descriptions[i] if i < len(descriptions) else "", description_format)
-                            worksheet_details.write(row, 2, created_dates[i] if i < len(created_dates) else "", default_cell_format)
-                            worksheet_details.write(row, 3, close_dates[i] if i < len(close_dates) else "", default_cell_format)
-                            worksheet_details.write(row, 4, statuses[i] if i < len(statuses) else "", default_cell_format)
-                            worksheet_details.write(row, 5, "HSE", default_cell_format)
+                        for description, created_date, close_date, status in zip_longest(descriptions, created_dates, close_dates, statuses, fillvalue=""):
+                            write(row, 0, site, default_site_format)
+                            write(row, 1, description, description_format)
+                            write_row(row, 2, [created_date, close_date, status, "HSE"], default_cell_format)
                             row += 1
 
-        safety_closed_data = all_reports.get("Safety_NCR_Closed", {})
+        # Like the NCR detail sheets, a report that is missing altogether gets no sheets
+        safety_closed_data = _all_reports.get("Safety_NCR_Closed", {})
         report_title_safety = f"Safety NCR: {date_part}"
-        write_safety_housekeeping_report("Safety", safety_closed_data, report_title_safety, "Closed")
-        safety_open_data = all_reports.get("Safety_NCR_Open", {})
-        write_safety_housekeeping_report("Safety", safety_open_data, report_title_safety, "Open")
-        housekeeping_closed_data = all_reports.get("Housekeeping_NCR_Closed", {})
+        if safety_closed_data:
+            write_safety_housekeeping_report("Safety", safety_closed_data, report_title_safety, "Closed")
+        safety_open_data = _all_reports.get("Safety_NCR_Open", {})
+        if safety_open_data:
+            write_safety_housekeeping_report("Safety", safety_open_data, report_title_safety, "Open")
+        housekeeping_closed_data = _all_reports.get("Housekeeping_NCR_Closed", {})
         report_title_housekeeping = f"Housekeeping NCR: {date_part}"
-        write_safety_housekeeping_report("Housekeeping", housekeeping_closed_data, report_title_housekeeping, "Closed")
-        housekeeping_open_data = all_reports.get("Housekeeping_NCR_Open", {})
-        write_safety_housekeeping_report("Housekeeping", housekeeping_open_data, report_title_housekeeping, "Open")
+        if housekeeping_closed_data:
+            write_safety_housekeeping_report("Housekeeping", housekeeping_closed_data, report_title_housekeeping, "Closed")
+        housekeeping_open_data = _all_reports.get("Housekeeping_NCR_Open", {})
+        if housekeeping_open_data:
+            write_safety_housekeeping_report("Housekeeping", housekeeping_open_data, report_title_housekeeping, "Open")
+
+    output.seek(0)
+    return output
+
+def generate_combined_csv_report_for_eden(all_reports):
+    """Detail rows of every report in all_reports as one CSV, without the workbook's formatting."""
+    return _generate_combined_csv_report(_reports_digest(all_reports), all_reports)
 
+@st.cache_data
+def _generate_combined_csv_report(report_digest, _all_reports):
+    output = io.BytesIO()
+    text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(['Report', 'Site', 'Description', 'Created Date (WET)', 'Expected Close Date (WET)', 'Status', 'Discipline'])
+
+    combined_result = _all_reports.get("Combined_NCR", {})
+    # (report label, report dict, fixed discipline); NCR rows carry their own Discipline list
+    sections = [
+        ("NCR Closed", combined_result.get("NCR resolved beyond 21 days", {}), None),
+        ("NCR Open", combined_result.get("NCR open beyond 21 days", {}), None),
+        ("Safety Closed", _all_reports.get("Safety_NCR_Closed", {}).get("Safety", {}), "HSE"),
+        ("Safety Open", _all_reports.get("Safety_NCR_Open", {}).get("Safety", {}), "HSE"),
+        ("Housekeeping Closed", _all_reports.get("Housekeeping_NCR_Closed", {}).get("Housekeeping", {}), "HSE"),
+        ("Housekeeping Open", _all_reports.get("Housekeeping_NCR_Open", {}).get("Housekeeping", {}), "HSE"),
+    ]
+    for report_name, report_data, discipline in sections:
+        if not isinstance(report_data, dict) or "error" in report_data:
+            continue
+        for site, site_data in report_data.get("Sites", {}).items():
+            normalized = _normalize_combined_site(site)
+            # Two-tower CommonAreas are listed under both towers, as in the workbook
+            display_sites = normalized if isinstance(normalized, tuple) else (normalized,)
+            columns = [
+                site_data.get("Descriptions", []),
+                site_data.get("Created Date (WET)", []),
+                site_data.get("Expected Close Date (WET)", []),
+                site_data.get("Status", []),
+                site_data.get("Discipline", []) if discipline is None else [],
+            ]
+            for display_site in display_sites:
+                for record in zip_longest(*columns, fillvalue=""):
+                    if discipline is not None:
+                        record = record[:4] + (discipline,)
+                    writer.writerow((report_name, display_site) + record)
+
+    text.flush()
+    text.detach()
     output.seek(0)
     return output
 
@@ -2392,10 +2352,7 @@ def generate_combined_excel_report_for_eden(all_reports, filename_prefix="All_Re
 
 # Helper function to generate report title
 def generate_report_title(prefix):
-    now = datetime.now()  # Current date: April 25, 2025
-    day = now.strftime("%d")
-    month_name = now.strftime("%B")
-    year = now.strftime("%Y")
+    day, month_name, year = _report_date_parts(datetime.now().date())
     return f"{prefix}: {day}_{month_name}_{year}"
 
 # Generate Safety NCR Report
@@ -298,7 +298,6 @@ def generate_ncr_report_for_veridia(df: pd.DataFrame, report_type: str, start_da
             processed_data = filtered_df.to_dict(orient="records")
             
             cleaned_data = []
-            unique_records = []
 
             # Pre-compile regex patterns for better performance
             common_pattern = re.compile(r"common area|flat\s*no", re.IGNORECASE)
@@ -321,6 +320,15 @@ def generate_ncr_report_for_veridia(df: pd.DataFrame, report_type: str, start_da
                     description = cleaned_record["Description"].lower().strip()
                     if not description:
                         continue  
+
+                    # Drop invalid and HSE disciplines before any module/tower regex work
+                    discipline = cleaned_record["Discipline"].strip().lower()
+                    if discipline == "none" or not discipline:
+                        logger.debug(f"Skipping record with invalid discipline: {discipline}")
+                        continue
+                    if "hse" in discipline:
+                        logger.debug(f"Skipping HSE record: {discipline}")
+                        continue  # Skip HSE records entirely
                     
                     # FIXED MODULE EXTRACTION LOGIC - This is the only change
                     if common_pattern.search(description):
@@ -375,29 +383,18 @@ def generate_ncr_report_for_veridia(df: pd.DataFrame, report_type: str, start_da
                 
 
                     # Initialize Discipline_Category
-                    discipline = cleaned_record["Discipline"].strip().lower()
-                    if discipline == "none" or not discipline:
-                        logger.debug(f"Skipping record with invalid discipline: {discipline}")
-                        continue
-                    elif "hse" in discipline:
-                        logger.debug(f"Skipping HSE record: {discipline}")
-                        cleaned_record["Discipline_Category"] = "HSE"
-                        continue  # Skip HSE records entirely
-                    elif "structure" in discipline or "sw" in discipline:
+                    if "structure" in discipline or "sw" in discipline:
                         cleaned_record["Discipline_Category"] = "SW"
                     elif "civil" in discipline or "finishing" in discipline or "fw" in discipline:
                         cleaned_record["Discipline_Category"] = "FW"
                     else:
                         cleaned_record["Discipline_Category"] = "MEP"
 
-                        
-                    unique_records.append(cleaned_record["Description"])
 
-                    # Tower categorization
+                    # Tower categorization: pick the tower(s) first, then append in one place below
                     if any(phrase in description for phrase in ["veridia clubhouse", "veridia-clubhouse", "veridia club"]):
-                        cleaned_record["Tower"] = "Veridia-Club"
+                        towers = ["Veridia-Club"]
                         logger.debug(f"Matched 'Veridia Clubhouse' in description: {description}")
-                        cleaned_data.append(cleaned_record)
                     else:
                         tower_matches = re.findall(r"(tower|t)\s*-?\s*(\d+)", description, re.IGNORECASE)
                         multiple_tower_pattern = re.search(
@@ -410,25 +407,26 @@ def generate_ncr_report_for_veridia(df: pd.DataFrame, report_type: str, start_da
                         if multiple_tower_pattern:
                             tower1 = multiple_tower_pattern.group(2).zfill(2)
                             tower2 = multiple_tower_pattern.group(5).zfill(2)
-                            for tower_num in [tower1, tower2]:
-                                tower_record = cleaned_record.copy()
-                                tower_record["Tower"] = f"Veridia-Tower-{tower_num}-CommonArea"
-                                cleaned_data.append(tower_record)
-                                logger.debug(f"Added common area record for Veridia-Tower-{tower_num}-CommonArea: {description}")
+                            towers = [f"Veridia-Tower-{tower_num}-CommonArea" for tower_num in [tower1, tower2]]
+                            logger.debug(f"Added common area records for {towers}: {description}")
                         elif flat_no_pattern and tower_matches:
                             tower_num = tower_matches[0][1].zfill(2)
-                            cleaned_record["Tower"] = f"Veridia-Tower-{tower_num}"
-                            cleaned_data.append(cleaned_record)
+                            towers = [f"Veridia-Tower-{tower_num}"]
                             logger.debug(f"Assigned Veridia-Tower-{tower_num} for Flat no description: {description}")
                         elif "common area" in description or not tower_matches:
-                            cleaned_record["Tower"] = "Common_Area"
-                            cleaned_data.append(cleaned_record)
+                            towers = ["Common_Area"]
                             logger.debug(f"Assigned Common_Area: {description}")
                         else:
                             tower_num = tower_matches[0][1].zfill(2)
-                            cleaned_record["Tower"] = f"Veridia-Tower-{tower_num}"
+                            towers = [f"Veridia-Tower-{tower_num}"]
                             logger.debug(f"Single tower match: Veridia-Tower-{tower_num}")
-                            cleaned_data.append(cleaned_record)
+
+                    if len(towers) == 1:
+                        cleaned_record["Tower"] = towers[0]
+                        cleaned_data.append(cleaned_record)
+                    else:
+                        # A record naming two towers is counted once under each
+                        cleaned_data.extend({**cleaned_record, "Tower": tower} for tower in towers)
                             
                 except Exception as e:
                     logger.error(f"Error processing record: {record}, error: {str(e)}")
@@ -1112,6 +1112,14 @@ if st.sidebar.button("All_Report", key="All_Report"):
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     key="download_all_reports"
                 )
+                csv_file = generate_combined_csv_report_for_eden(all_reports)
+                st.download_button(
+                    label="📥 Download All Reports CSV (data only)",
+                    data=csv_file,
+                    file_name=f"All_Reports_{day}_{month_name}_{year}.csv",
+                    mime="text/csv",
+                    key="download_all_reports_csv"
+                )
         else:
             st.error("Please fetch data first!")
 #===================================================EDEN=========================================================